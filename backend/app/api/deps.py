@@ -1,6 +1,7 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -8,25 +9,48 @@ from app.core import security
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
+from app.utils.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.SOS_API_PREFIX}/auth/signin")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
+# Verified token -> user id, and user id -> detached User row. TTL-only: no endpoint
+# changes users or revokes tokens, so entries just expire (tokens never past their exp).
+_token_cache = TTLCache(max_size=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+_user_cache = TTLCache(max_size=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="자격 증명을 검증할 수 없습니다.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """Resolve the user id from the token without touching the DB"""
+    user_id = _token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+        user_id, expires_at = security.decode_access_token(token)
+    except ValueError:
+        raise _credentials_exception()
+
+    # Never cache a token past its expiry
+    _token_cache.set(token, user_id, ttl=expires_at - time.time())
+    return user_id
+
+async def get_current_user(user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_db)) -> User:
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    # Detach so the cached row is not expired by this request's commit
+    db.expunge(user)
+    _user_cache.set(user_id, user)
     return user
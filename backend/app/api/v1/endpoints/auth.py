@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.session import get_db
+from app.db.upsert import dialect_insert
 from app.models.user import User
 from app.schemas.user import UserLogin, UserCreate
 from app.schemas.token import Token
@@ -13,22 +14,29 @@ router = APIRouter()
 
 @router.post("/signin", response_model=Token)
 async def signin(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
-    # Check if user exists
-    result = await db.execute(select(User).where(User.phone == user_in.phone))
-    user = result.scalars().first()
+    # Returning users (the common case) are one read, without taking the write lock
+    result = await db.execute(
+        select(User.id, User.name, User.created_at).where(User.phone == user_in.phone)
+    )
+    user = result.first()
 
-    if not user:
-        # Create new user
-        user = User(name=user_in.name, phone=user_in.phone)
-        db.add(user)
+    if user is None:
+        # New user: one upsert. A phone created by a concurrent sign-in in the
+        # meantime conflicts and its row is returned instead of raising.
+        stmt = dialect_insert(db, User).values(name=user_in.name, phone=user_in.phone)
+        stmt = (
+            stmt.on_conflict_do_update(index_elements=[User.phone], set_={"phone": stmt.excluded.phone})
+            .returning(User.id, User.name, User.created_at)
+        )
+        user = (await db.execute(stmt)).first()
         await db.commit()
-        await db.refresh(user)
-    elif user.name != user_in.name:
+
+    if user.name != user_in.name:
         raise HTTPException(
             status_code=400,
             detail="이미 존재하는 사용자입니다. 다시 확인해주세요."
         )
-    
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         subject=user.id, expires_delta=access_token_expires
@@ -37,5 +45,5 @@ async def signin(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
     return {
         "accessToken": access_token,
         "token_type": "bearer",
-        "user": user
+        "user": user._asdict()
     }
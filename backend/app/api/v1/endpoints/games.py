@@ -1,87 +1,223 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
-from app.db.session import get_db
+from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import aliased
+from app.db.session import get_db, get_read_db
 from app.models.user import User
 from app.models.game import GameRecord
 from app.schemas.game import GameRecordCreate, GameRecordResponse, GameHistoryResponse
 from app.api import deps
 from app.core.config import settings
+from app.core.leaderboard import leaderboard
+from app.core.broadcaster import ranking_broadcaster
+from app.db.upsert import upsert_best_record
+from app.db.record_queue import record_write_queue
 
 router = APIRouter()
 
 @router.get("/hidden-message", response_model=dict)
 async def get_hidden_message(
-    current_user: User = Depends(deps.get_current_user),
+    user_id: int = Depends(deps.get_current_user_id),
 ):
-    from app.core.redis import redis_client
-
-    # Check rank via Redis (0-indexed, so 0 is Rank 1)
-    rank_index = await redis_client.zrank("game_ranks", str(current_user.id))
+    # Check the all-time rank
+    member_rank = await leaderboard.member_rank(user_id)
 
-    if rank_index is None:
+    if member_rank is None:
         raise HTTPException(status_code=403, detail="게임 기록이 없습니다.")
 
-    if rank_index != 0:
+    if member_rank[0] != 1:
          raise HTTPException(status_code=403, detail="1등만 히든 메시지를 확인할 수 있습니다.")
 
     return {"messages": settings.HIDDEN_MESSAGES}
 
+def _encode_cursor(sort_value, record_id: int, *rank_state: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort_value, record_id, *rank_state]).encode()).decode()
+
+def _decode_cursor(cursor: str, sort_by: str):
+    """(sort value, record id, rank state); record cursors carry the row's (rank, ties), date cursors None"""
+    try:
+        sort_value, record_id, *rank_state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_by == "record":
+            rank, ties = rank_state
+            return int(sort_value), int(record_id), (int(rank), int(ties))
+        return datetime.fromisoformat(sort_value), int(record_id), None
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="유효하지 않은 커서입니다.")
+
+async def _record_ranks(db: AsyncSession, user_id: int, rows, order: str, skip: int, full: bool, anchor=None):
+    """
+    Personal ranks (RANK semantics: 1 + the user's faster records) of a page sorted by
+    record, derived from the page order instead of counting per row.
+    anchor: (clear_time_ms, rank, ties) of the cursor row, where ties counts the records
+    with its time up to and including it. Returns (ranks, ties of the last row).
+    Ascending cursor pages run no query; other pages count once, at the page edge.
+    """
+    if order == "asc":
+        if anchor:
+            time_ms, rank, ties = anchor
+            position = rank - 1 + ties  # Records up to and including the cursor row
+        elif skip:
+            time_ms = rows[0].clear_time_ms
+            result = await db.execute(
+                select(func.count()).select_from(GameRecord)
+                .where(GameRecord.user_id == user_id, GameRecord.clear_time_ms < time_ms)
+            )
+            rank, position = result.scalar() + 1, skip
+        else:
+            time_ms, rank, position = None, 0, 0
+        ordered = rows
+    else:
+        # Walk the page bottom-up, i.e. ascending from the records below it
+        last = rows[-1]
+        if anchor and anchor[0] == last.clear_time_ms:
+            # The whole page ties with the cursor row
+            return [anchor[1]] * len(rows), anchor[2] + len(rows)
+        # Below the page: records faster than its last time, and that time's ties with smaller ids
+        same_time_below = and_(GameRecord.clear_time_ms == last.clear_time_ms, GameRecord.id < last.id)
+        if anchor:
+            below = 0
+            if full:
+                result = await db.execute(
+                    select(func.count()).select_from(GameRecord)
+                    .where(GameRecord.user_id == user_id, same_time_below)
+                )
+                below = result.scalar()
+            # The cursor row's rank counts everything below it: the page rows faster than it and the above
+            faster = anchor[1] - 1 - below - sum(1 for row in rows if row.clear_time_ms < anchor[0])
+        else:
+            result = await db.execute(
+                select(
+                    func.count().filter(GameRecord.clear_time_ms < last.clear_time_ms),
+                    func.count().filter(same_time_below)
+                )
+                .select_from(GameRecord)
+                .where(GameRecord.user_id == user_id, GameRecord.clear_time_ms <= last.clear_time_ms)
+            )
+            faster, below = result.one()
+        time_ms, rank, position = last.clear_time_ms, faster + 1, faster + below
+        ordered = rows[::-1]
+
+    ranks = []
+    for row in ordered:
+        position += 1
+        if row.clear_time_ms != time_ms:
+            time_ms, rank = row.clear_time_ms, position
+        ranks.append(rank)
+
+    if order == "asc":
+        return ranks, position - rank + 1
+    ranks.reverse()
+    return ranks, sum(1 for row in rows if row.clear_time_ms == rows[-1].clear_time_ms)
+
 @router.get("/history", response_model=GameHistoryResponse)
 async def get_my_game_history(
     skip: int = 0,
     limit: int = 10,
     sort_by: str = "date",
     order: str = "desc",
-    current_user: User = Depends(deps.get_current_user),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    # 1. Get total count
-    count_query = select(func.count()).select_from(GameRecord).where(GameRecord.user_id == current_user.id)
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit은 1 이상이어야 합니다.")
 
-    # 2. Prepare sorting
+    # 1. The page is read straight from the (user_id, played_at) / (user_id, clear_time_ms)
+    # indexes: keyset or offset, ORDER BY and LIMIT all apply to the base query.
+    count_query = select(func.count()).select_from(GameRecord).where(GameRecord.user_id == user_id)
+    columns = [GameRecord.id, GameRecord.clear_time_ms, GameRecord.played_at]
+    if sort_by != "record":
+        # Personal rank of date-sorted rows: a correlated count of faster records per row
+        faster = aliased(GameRecord)
+        rank = (
+            select(func.count() + 1)
+            .where(faster.user_id == user_id, faster.clear_time_ms < GameRecord.clear_time_ms)
+            .scalar_subquery()
+        )
+        columns.append(rank.label("rank"))
+    if not cursor:
+        # Offset pages show a page count: total in the same statement (evaluated once)
+        columns.append(count_query.correlate(None).scalar_subquery().label("total"))
+    query = select(*columns).where(GameRecord.user_id == user_id)
+
+    # 2. Prepare sorting (record id breaks ties so the cursor position is unique)
     sort_column = GameRecord.played_at
     if sort_by == "record":
         sort_column = GameRecord.clear_time_ms
-    
-    order_clause = sort_column.desc()
+
     if order == "asc":
-        order_clause = sort_column.asc()
-
-    # 3. Get paginated records
-    query = (
-        select(GameRecord)
-        .where(GameRecord.user_id == current_user.id)
-        .order_by(order_clause)
-        .offset(skip)
-        .limit(limit)
-    )
-    result = await db.execute(query)
-    records = result.scalars().all()
-
-    history_list = []
-    for record in records:
-        # Calculate Personal Rank: How many of MY records are better than this one?
-        rank_query = select(func.count()).select_from(GameRecord).where(
-            GameRecord.user_id == current_user.id,
-            GameRecord.clear_time_ms < record.clear_time_ms
-        )
-        rank_result = await db.execute(rank_query)
-        better_count = rank_result.scalar()
-        personal_rank = better_count + 1
+        query = query.order_by(sort_column.asc(), GameRecord.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), GameRecord.id.desc())
+
+    # 3. Paginate: keyset when a cursor is given, offset otherwise
+    anchor = None
+    if cursor:
+        cursor_value, cursor_id, rank_state = _decode_cursor(cursor, sort_by)
+        if rank_state:
+            anchor = (cursor_value, *rank_state)
+        if order == "asc":
+            query = query.where(or_(
+                sort_column > cursor_value,
+                and_(sort_column == cursor_value, GameRecord.id > cursor_id)
+            ))
+        else:
+            query = query.where(or_(
+                sort_column < cursor_value,
+                and_(sort_column == cursor_value, GameRecord.id < cursor_id)
+            ))
+    else:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit))
+    rows = result.all()
 
-        history_list.append({
-            "rank": personal_rank,
-            "record": f"{record.clear_time_ms / 1000:.2f}",
-            "date": record.played_at.isoformat() if record.played_at else "-"
-        })
+    if cursor:
+        # Cursor pages do not count the user's records
+        total = None
+    elif rows:
+        total = rows[0].total
+    elif skip:
+        # Past the last page: no row carries the total
+        total = (await db.execute(count_query)).scalar()
+    else:
+        total = 0
+
+    # Record-sorted ranks follow from the page order and the cursor row's rank
+    last_ties = None
+    if sort_by == "record" and rows:
+        ranks, last_ties = await _record_ranks(db, user_id, rows, order, skip, len(rows) == limit, anchor)
+    else:
+        ranks = [row.rank for row in rows]
+
+    history_list = [
+        {
+            "rank": rank,
+            "record": f"{row.clear_time_ms / 1000:.2f}",
+            "date": row.played_at.isoformat() if row.played_at else "-"
+        }
+        for row, rank in zip(rows, ranks)
+    ]
+
+    next_cursor = None
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        if sort_by == "record":
+            next_cursor = _encode_cursor(last.clear_time_ms, last.id, ranks[-1], last_ties)
+        else:
+            next_cursor = _encode_cursor(last.played_at, last.id)
 
     return {
         "items": history_list,
-        "total": total
+        "total": total,
+        "nextCursor": next_cursor
     }
 
 import logging
@@ -102,84 +238,49 @@ async def create_game_record(
         logger.warning(f"Suspicious record attempt: User {current_user.id} - {record_in.clearTimeMs}ms")
         raise HTTPException(status_code=400, detail="유효하지 않은 기록입니다.")
 
-    # Capture user_id before commit to avoid MissingGreenlet error (lazy load after commit)
+    # Capture user fields before commit to avoid MissingGreenlet error (lazy load after commit)
     user_id = current_user.id
+    user_name = current_user.name
 
-    # Save record
-    game_record = GameRecord(
-        user_id=user_id,
-        clear_time_ms=record_in.clearTimeMs
-    )
-    db.add(game_record)
-    await db.commit()
-    await db.refresh(game_record)
+    # Save record and update the user's best record in the same transaction
+    played_at = datetime.now(timezone.utc)
+    if settings.RECORD_INGEST_MODE == "batched":
+        # Group commit: resolves once the micro-batch containing this record commits
+        await record_write_queue.submit(user_id, record_in.clearTimeMs, played_at)
+    else:
+        game_record = GameRecord(
+            user_id=user_id,
+            clear_time_ms=record_in.clearTimeMs,
+            played_at=played_at
+        )
+        db.add(game_record)
+        await db.flush()
+        await upsert_best_record(db, user_id, record_in.clearTimeMs, played_at)
+        await db.commit()
     
     logger.info(f"Game record created: User {user_id} - {record_in.clearTimeMs}ms")
 
-    # Calculate rank using Redis
-    from app.core.redis import redis_client
-    
-    # Update Redis ZSET (Only keep best time - lower is better)
-    # ZADD with 'lt' (Less Than) option only updates if new score is less than existing score.
-    # 'ch' (Changed) option makes it return number of keys changed (added or updated)
-    changed = await redis_client.zadd("game_ranks", {str(user_id): record_in.clearTimeMs}, lt=True, ch=True)
-    
-    # Get Rank (0-based index)
-    rank_index = await redis_client.zrank("game_ranks", str(user_id))
-    rank = rank_index + 1
+    # Update best time (and the cached ranking row) on the leaderboard, then get the rank
+    result = await leaderboard.record(
+        user_id, user_name, record_in.clearTimeMs, played_at,
+        settings.RANKING_BROADCAST_DEPTH, settings.RANKING_RANK_CHANGED_LIMIT
+    )
 
-    # Broadcast ranking update
-    # Only broadcast if:
-    # 1. The user is in the top 10
+    # Schedule a ranking broadcast (coalesced and sent by the background broadcaster)
+    # Only if:
+    # 1. The user landed on a live page
     # 2. The record was actually updated (improved) or added (changed > 0)
-    if rank <= 10 and changed > 0:
-        from app.core.socket import sio
-        from app.utils.masking import mask_name
-        
-        # 1. Get Top 10 from Redis
-        # Returns list of (member, score) tuples
-        top_records = await redis_client.zrange("game_ranks", 0, 9, withscores=True)
-        
-        if top_records:
-            # ... (Logic remains same)
-            # 2. Get User Details from DB
-            user_ids = [int(uid) for uid, _ in top_records]
-            
-            # Fetch users in bulk
-            user_query = select(User).where(User.id.in_(user_ids))
-            user_result = await db.execute(user_query)
-            users = {user.id: user for user in user_result.scalars().all()}
-            
-            # 3. Build Ranking List
-            ranking_list = []
-            for i, (uid_str, score) in enumerate(top_records):
-                uid = int(uid_str)
-                user_obj = users.get(uid)
-                name = user_obj.name if user_obj else "Unknown"
-                
-                # Fetch date for this record (best effort)
-                date_str = ""
-                try:
-                    record_query = select(GameRecord.played_at).where(
-                        GameRecord.user_id == uid,
-                        GameRecord.clear_time_ms == int(score)
-                    ).limit(1)
-                    record_result = await db.execute(record_query)
-                    record_date = record_result.scalar()
-                    if record_date:
-                        date_str = record_date.strftime("%Y-%m-%d")
-                except Exception:
-                    pass
-                
-                ranking_list.append({
-                    "rank": i + 1,
-                    "userId": str(uid),
-                    "name": mask_name(name),
-                    "record": f"{score / 1000:.2f}",
-                    "date": date_str
-                })
-            
-            await sio.emit('ranking_update', ranking_list, namespace='/ranking')
-            logger.info(f"Ranking broadcast sent for User {user_id} (Rank {rank})")
-
-    return {"success": True, "rank": rank}
+    # Ranks from the new one down to the previous one (or the end, for a new player) shifted.
+    if result.rank <= settings.RANKING_BROADCAST_DEPTH * settings.RANKING_LIVE_PAGES and result.changed > 0:
+        ranking_broadcaster.mark_dirty(result.version, result.top, result.rank, result.previous_rank)
+
+    # Everyone from the new rank down to the previous one moved down a place:
+    # clients shift their own rank locally
+    if result.changed > 0 and result.rank != result.previous_rank:
+        ranking_broadcaster.queue_rank_shift(result.rank, result.previous_rank)
+
+    # Tell the players this record overtook (pushed to their personal rooms by the broadcaster)
+    if result.displaced:
+        ranking_broadcaster.queue_rank_changes(result.displaced)
+
+    return {"success": True, "rank": result.rank}
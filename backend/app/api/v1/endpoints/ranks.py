@@ -1,103 +1,121 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy import func
-from app.db.session import get_db
-from app.models.user import User
-from app.models.game import GameRecord
-from app.schemas.game import MyRankResponse
+from app.db.session import get_read_db
 from app.schemas.game import MyRankResponse
 from app.api import deps
+from app.core.leaderboard import PERIODS, format_record, get_board, leaderboard
 
 router = APIRouter()
 
+
+def _check_period(period: str):
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail="유효하지 않은 기간입니다.")
+
+
 @router.get("/my", response_model=MyRankResponse)
 async def get_my_rank(
-    current_user: User = Depends(deps.get_current_user),
-    db: AsyncSession = Depends(get_db)
+    period: str = "all",
+    user_id: int = Depends(deps.get_current_user_id),
 ):
-    from app.core.redis import redis_client
-    
-    # 1. Get Rank and Score from Redis
-    rank_index = await redis_client.zrank("game_ranks", str(current_user.id))
-    score = await redis_client.zscore("game_ranks", str(current_user.id))
+    _check_period(period)
 
-    if rank_index is None or score is None:
+    # Rank and score from the period's board
+    member_rank = await leaderboard.member_rank(user_id, period)
+    if member_rank is None:
         return {"rank": 0, "record": "0.00"}
 
+    rank, score = member_rank
+    return {
+        "rank": rank,
+        "record": format_record(score)
+    }
+
+from app.core.config import settings
+from app.schemas.ranking import RankingAroundResponse, RankingHistogramResponse
+from app.core.leaderboard import percentile
+
+AROUND_MAX_K = 50
+
+
+@router.get("/around", response_model=RankingAroundResponse)
+async def get_ranks_around_me(
+    k: int = 5,
+    period: str = "all",
+    user_id: int = Depends(deps.get_current_user_id),
+):
+    _check_period(period)
+
+    # The user's neighbourhood without paging through the board
+    items, rank, total = await leaderboard.around(user_id, max(0, min(k, AROUND_MAX_K)), period)
     return {
-        "rank": rank_index + 1,
-        "record": f"{score / 1000:.2f}"
+        "items": items,
+        "rank": rank,
+        "total": total,
+        "percentile": percentile(rank, total) if rank else 0.0
     }
 
-from typing import List
-from app.schemas.ranking import RankingItem, RankingListResponse
-from app.utils.masking import mask_name
-from app.core.redis import redis_client
+
+@router.get("/histogram", response_model=RankingHistogramResponse)
+async def get_ranks_histogram(period: str = "all"):
+    _check_period(period)
+
+    # Maintained incrementally by the record script
+    buckets = await leaderboard.histogram(period)
+    return {
+        "bucketMs": settings.RANKING_HISTOGRAM_BUCKET_MS,
+        "total": sum(count for _, count in buckets),
+        "buckets": [{"fromMs": bucket, "count": count} for bucket, count in buckets]
+    }
+
+from fastapi import Request, Response
+from app.schemas.ranking import RankingListResponse
+from app.utils.cache import TTLCache
+
+# (board window, skip, limit, version) -> serialized RankingListResponse. A new
+# version makes old entries unreachable; the LRU bound evicts them. Daily and
+# weekly versions restart in every window, so the window (rank key) is part of the key.
+_page_cache = TTLCache(settings.RANKING_PAGE_CACHE_MAX_SIZE, settings.RANKING_PAGE_CACHE_TTL_SECONDS)
+
+
+def _etag(window: str, skip: int, limit: int, version: int) -> str:
+    return f'"{window}-{version}-{skip}-{limit}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
 
 @router.get("", response_model=RankingListResponse)
 async def get_ranks(
+    request: Request,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(get_db)
+    period: str = "all",
+    db: AsyncSession = Depends(get_read_db)
 ):
-    # 1. Get Range from Redis
-    # Returns list of (member, score) tuples
-    top_records = await redis_client.zrange("game_ranks", skip, skip + limit - 1, withscores=True)
-    
-    total_count = await redis_client.zcard("game_ranks")
-
-    ranking_list = []
-    if top_records:
-        user_ids = [int(uid) for uid, _ in top_records]
-        
-        # 2. Get User Details
-        user_query = select(User).where(User.id.in_(user_ids))
-        user_result = await db.execute(user_query)
-        users = {user.id: user for user in user_result.scalars().all()}
-        
-        # 3. Get Dates (Optional but good for UI) - optimized: get best record date for these users
-        # We want the date of the record that matches the score.
-        # Construct a query to get metadata for these specific user/score pairs?
-        # Simpler: Get latest game date for these users? Or just fetch best record.
-        # Let's do a bulk query for GameRecords matching user_id and approximate time?
-        # Actually, let's just do N small queries or one IN query.
-        # Since standard is "best time", let's query the specific best time record for each.
-        
-        # Optimization: Fetch one record per user where clear_time matches score.
-        # Since we have the score (clear_time_ms) from Redis.
-        
-        for i, (uid_str, score) in enumerate(top_records):
-            uid = int(uid_str)
-            user_obj = users.get(uid)
-            name = user_obj.name if user_obj else "Unknown"
-            
-            # Fetch date for this record (best effort)
-            date_str = ""
-            try:
-                # Find exactly this record
-                record_query = select(GameRecord.played_at).where(
-                    GameRecord.user_id == uid,
-                    GameRecord.clear_time_ms == int(score) # score in Redis is float, but we stored int? Redis stores float.
-                    # We stored int `clearTimeMs` passed to zadd.
-                ).limit(1)
-                record_result = await db.execute(record_query)
-                record_date = record_result.scalar()
-                if record_date:
-                    date_str = record_date.strftime("%Y-%m-%d")
-            except Exception:
-                pass
-
-            ranking_list.append({
-                "rank": skip + i + 1,
-                "userId": str(uid),
-                "name": mask_name(name),
-                "record": f"{score / 1000:.2f}",
-                "date": date_str
-            })
+    _check_period(period)
 
-    return {
-        "items": ranking_list,
-        "total": total_count
-    }
+    # Pages only change when the board version does: one GET decides
+    # between 304, a cached body and a rebuild.
+    window = get_board(period).rank_key
+    version = await leaderboard.version(period)
+    headers = {"ETag": _etag(window, skip, limit, version), "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    body = _page_cache.get((window, skip, limit, version))
+    if body is None:
+        # Ranking rows (masked name, best-record date) are served from the leaderboard read model.
+        # The DB session is only used to backfill all-time members that predate it.
+        ranking_list, total_count, version = await leaderboard.page(skip, limit, period, db)
+        body = RankingListResponse(
+            items=ranking_list, total=total_count, version=version
+        ).model_dump_json().encode()
+        _page_cache.set((window, skip, limit, version), body)
+        headers["ETag"] = _etag(window, skip, limit, version)
 
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.leaderboard import format_record, leaderboard
+from app.core.metrics import RANK_CHANGED_EMITS, RANKING_UPDATE_EMITS, RANKS_SHIFTED_EMITS
+from app.core.socket import page_has_subscribers, page_room, sio, user_room
+from app.db.session import ReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# SOCKETIO_SERIALIZER=msgpack clients receive ranking rows in the compact schema
+COMPACT_PAYLOADS = settings.SOCKETIO_SERIALIZER == "msgpack"
+
+
+def compact_row(row: dict) -> list:
+    """
+    Ranking row as [rank, userId, name, record]: userId an int and record in 1/100 s
+    (format_record prints two decimals, so "45.20" -> 4520). The date is not sent,
+    the live board does not show it.
+    """
+    return [row["rank"], int(row["userId"]), row["name"], int(row["record"].replace(".", ""))]
+
+
+def compact_payload(payload: dict) -> dict:
+    """Socket payload with rows, userIds and records in the compact schema"""
+    compact = dict(payload)
+    for key in ("items", "moved", "inserted"):
+        if key in compact:
+            compact[key] = [compact_row(row) for row in compact[key]]
+    if "dropped" in compact:
+        compact["dropped"] = [int(uid) for uid in compact["dropped"]]
+    if "record" in compact:
+        compact["record"] = int(compact["record"].replace(".", ""))
+    return compact
+
+
+def wire_payload(payload: dict) -> dict:
+    """Payload as emitted with the configured serializer"""
+    return compact_payload(payload) if COMPACT_PAYLOADS else payload
+
+
+def build_patch(previous: List[dict], current: List[dict]) -> dict:
+    """
+    Diff two top-N lists by userId.
+    moved: rows present in both whose rank or record changed
+    inserted: rows that entered the top N
+    dropped: userIds that left the top N
+    """
+    previous_rows = {row["userId"]: row for row in previous}
+    current_ids = {row["userId"] for row in current}
+
+    moved, inserted = [], []
+    for row in current:
+        old = previous_rows.get(row["userId"])
+        if old is None:
+            inserted.append(row)
+        elif old != row:
+            moved.append(row)
+
+    dropped = [uid for uid in previous_rows if uid not in current_ids]
+    return {"moved": moved, "inserted": inserted, "dropped": dropped}
+
+
+class RankingBroadcaster:
+    """
+    Background task that emits 'ranking_update' patches on the /ranking namespace.
+    Record submissions only mark a rank range dirty; the task coalesces
+    all marks within an interval into one rebuild and emit per affected page,
+    sent only to that page's room (and only if it has subscribers).
+    Personal 'rank_changed' pushes are handed over the same way, so the
+    record request never waits on Socket.IO emits. The rank ranges every
+    submission pushed down go to all sockets as one 'ranks_shifted' per
+    interval, so clients keep their own rank without polling.
+
+    Each patch carries the leaderboard 'version' it brings clients to and the
+    'base' version it applies on. Clients whose version differs from 'base'
+    refetch GET /ranks. Pages skipped for lack of subscribers keep an outdated
+    last broadcast, so their next patch has no base and the connect snapshot
+    is read fresh.
+    """
+
+    def __init__(self, interval: float, depth: int, pages: int):
+        self.interval = interval
+        self.depth = depth  # Rows per page
+        self.pages = pages  # Live pages
+        self.payload: List[dict] = []  # Last broadcast top-N (page 0)
+        self.version = 0
+        # 'ranking_snapshot' sent to new sockets: {"page": 0, "version", "items"} (wire format)
+        self._snapshot: Optional[dict] = None
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Newest (version, top-N range) handed over by record submissions
+        self._top_hint: Optional[Tuple[int, List[Tuple[str, float]]]] = None
+        # Changed ranks since the last broadcast: (first, last), last None = to the end
+        self._dirty_ranks: Optional[Tuple[int, Optional[int]]] = None
+        # Pending 'rank_changed' pushes: member -> (score, rank, rank before the first push)
+        self._rank_changes: Dict[str, Tuple[float, int, int]] = {}
+        # Pending 'ranks_shifted' ranges, in submission order
+        self._rank_shifts: List[Tuple[int, Optional[int]]] = []
+        # Pages that changed while nobody on this worker followed them
+        self._stale_pages: Set[int] = set()
+
+    def mark_dirty(
+        self,
+        version: Optional[int] = None,
+        top: Optional[List[Tuple[str, float]]] = None,
+        first_rank: int = 1,
+        last_rank: Optional[int] = None
+    ):
+        """
+        Schedule a broadcast for ranks first_rank..last_rank (1-based, inclusive;
+        last_rank None = every rank below). Submissions that already read the
+        top-N range (with the version it belongs to) pass it so the broadcast
+        can skip the ZRANGE for page 0.
+        """
+        if top and version is not None and (self._top_hint is None or version > self._top_hint[0]):
+            self._top_hint = (version, top)
+        if self._dirty_ranks is None:
+            self._dirty_ranks = (first_rank, last_rank)
+        else:
+            first, last = self._dirty_ranks
+            self._dirty_ranks = (
+                min(first, first_rank),
+                None if last is None or last_rank is None else max(last, last_rank)
+            )
+        self._dirty.set()
+
+    def queue_rank_changes(self, displaced: List[Tuple[str, float, int]]):
+        """
+        Schedule 'rank_changed' for players a submission pushed down one place
+        [(member, score, new rank)]. Several overtakes within an interval
+        become one push per player.
+        """
+        for member, score, rank in displaced:
+            pending = self._rank_changes.get(member)
+            self._rank_changes[member] = (score, rank, pending[2] if pending else rank - 1)
+        self._dirty.set()
+
+    def queue_rank_shift(self, first_rank: int, last_rank: Optional[int]):
+        """
+        Schedule a 'ranks_shifted' range: the players previously ranked
+        first_rank..last_rank - 1 moved down one place (last_rank None = every
+        rank from first_rank on, for a new player).
+        """
+        self._rank_shifts.append((first_rank, last_rank))
+        self._dirty.set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            try:
+                await self.broadcast()
+            except Exception:
+                logger.exception("Ranking broadcast failed")
+            shifts, self._rank_shifts = self._rank_shifts, []
+            try:
+                await notify_rank_shifts(shifts)
+            except Exception:
+                logger.exception("ranks_shifted push failed")
+            # After the shifts: clients take the pushed rank as is
+            changes, self._rank_changes = self._rank_changes, {}
+            try:
+                await notify_rank_changes(changes)
+            except Exception:
+                logger.exception("rank_changed push failed")
+            # Marks arriving while we sleep are folded into the next broadcast
+            await asyncio.sleep(self.interval)
+
+    async def snapshot(self) -> dict:
+        """
+        Top N for newly connected sockets: the last page-0 broadcast, which is
+        the 'base' the next page-0 patch applies on, so clients can follow the
+        patch stream without GET /ranks. A connect costs one read of that
+        broadcast; the wire payload is built once per broadcast version.
+        """
+        current = None if 0 in self._stale_pages else await leaderboard.load_broadcast(0)
+        if current is None:
+            # Nothing broadcast yet, or outdated: read the page and make it the next patch's base
+            async with ReadSessionLocal() as db:
+                items, _, version = await leaderboard.page(0, self.depth, db=db)
+            current = {"version": version, "items": items}
+            await leaderboard.store_broadcast(current, 0)
+            self._stale_pages.discard(0)
+        if self._snapshot is None or self._snapshot["version"] != current["version"]:
+            self._snapshot = wire_payload({"page": 0, "version": current["version"], "items": current["items"]})
+        return self._snapshot
+
+    def affected_pages(self, first_rank: int, last_rank: Optional[int]) -> range:
+        """Live pages overlapping ranks first_rank..last_rank"""
+        last_page = self.pages - 1 if last_rank is None else min((last_rank - 1) // self.depth, self.pages - 1)
+        return range((first_rank - 1) // self.depth, last_page + 1)
+
+    async def broadcast(self):
+        hint, self._top_hint = self._top_hint, None
+        dirty, self._dirty_ranks = self._dirty_ranks, None
+        if dirty is None:
+            return
+
+        async with ReadSessionLocal() as db:
+            for page in self.affected_pages(*dirty):
+                if not page_has_subscribers(page):
+                    self._stale_pages.add(page)
+                    continue
+                if page == 0 and hint is not None:
+                    version, top = hint
+                    ranking_list = await leaderboard.rows(top, 0, db)
+                else:
+                    ranking_list, _, version = await leaderboard.page(page * self.depth, self.depth, db=db)
+                await self._emit_page(page, version, ranking_list)
+
+    async def _emit_page(self, page: int, version: int, ranking_list: List[dict]):
+        # Diff against the last snapshot of this page any worker broadcast
+        # (none if the page changed unwatched since: the patch then has no base)
+        previous = None if page in self._stale_pages else await leaderboard.load_broadcast(page)
+        previous = previous or {"version": None, "items": []}
+        if previous["version"] is not None and version <= previous["version"]:
+            return  # Another worker already broadcast this (or a newer) version
+        base = previous["version"]
+
+        patch = build_patch(previous["items"], ranking_list)
+        await leaderboard.store_broadcast({"version": version, "items": ranking_list}, page)
+        self._stale_pages.discard(page)
+        if page == 0:
+            self.payload = ranking_list
+            self.version = version
+
+        if not any(patch.values()):
+            return
+
+        await sio.emit(
+            'ranking_update', wire_payload({"page": page, "version": version, "base": base, **patch}),
+            room=page_room(page), namespace='/ranking'
+        )
+        RANKING_UPDATE_EMITS.inc()
+        logger.info(
+            f"Ranking patch v{version} sent to page {page} "
+            f"(moved {len(patch['moved'])}, inserted {len(patch['inserted'])}, dropped {len(patch['dropped'])})"
+        )
+
+
+async def notify_rank_shifts(shifts: List[Tuple[int, Optional[int]]]):
+    """Send the shifted rank ranges [[first, last or None], ...] to every socket on /ranking"""
+    if not shifts:
+        return
+    await sio.emit('ranks_shifted', {"shifts": [list(shift) for shift in shifts]}, namespace='/ranking')
+    RANKS_SHIFTED_EMITS.inc()
+
+
+async def notify_rank_changes(changes: Dict[str, Tuple[float, int, int]]):
+    """Push 'rank_changed' to the personal rooms of overtaken players {member: (score, rank, previous rank)}"""
+    for member, (score, rank, previous_rank) in changes.items():
+        await sio.emit(
+            'rank_changed',
+            wire_payload({"rank": rank, "previousRank": previous_rank, "record": format_record(score)}),
+            room=user_room(member),
+            namespace='/ranking'
+        )
+        RANK_CHANGED_EMITS.inc()
+
+
+ranking_broadcaster = RankingBroadcaster(
+    interval=settings.RANKING_BROADCAST_INTERVAL_SECONDS,
+    depth=settings.RANKING_BROADCAST_DEPTH,
+    pages=settings.RANKING_LIVE_PAGES
+)
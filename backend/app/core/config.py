@@ -10,17 +10,47 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
 
+    # Auth cache (verified tokens and their users, per process, expiry only). TTL 0 disables it.
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/sos.db"
+    DATABASE_READ_URL: str = ""  # Read-only endpoints (defaults to DATABASE_URL)
+
+    # Storage profile: "default" (single engine, driver defaults) or
+    # "tuned" (SQLite pragmas below, separate read engine and pool)
+    DB_STORAGE_PROFILE: str = "default"
+    DB_WRITE_POOL_SIZE: int = 5
+    DB_WRITE_MAX_OVERFLOW: int = 10
+    DB_READ_POOL_SIZE: int = 10
+    DB_READ_MAX_OVERFLOW: int = 20
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL; loses at most the last commits on power loss
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64000  # Negative = KiB (64 MB)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Share Socket.IO emits between workers through Redis pub/sub (disable for single-process/offline runs)
+    SOCKETIO_REDIS_MANAGER: bool = True
+    # Socket.IO packet format: "default" (JSON) or "msgpack" (binary packets and compact ranking
+    # rows, see app/core/broadcaster.py); the frontend must be built with the same VITE_SOCKET_SERIALIZER
+    SOCKETIO_SERIALIZER: str = "default"
 
     # AWS S3
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = "ap-northeast-2"
     S3_BUCKET_NAME: str = ""
+    S3_LOCAL_DIR: str = ""  # Serve puzzle images from this directory instead of S3 (offline/benchmarks)
+
+    # Puzzle image catalog
+    PUZZLE_CATALOG_TTL_SECONDS: int = 300  # Key list refresh interval
+    PUZZLE_CATALOG_RETRY_SECONDS: int = 10  # Retry delay after a failed listing (the old list is kept)
+    PUZZLE_URL_EXPIRATION_SECONDS: int = 300  # Presigned URL lifetime
+    PUZZLE_URL_REFRESH_MARGIN_SECONDS: int = 60  # Re-sign when less than this is left
 
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -28,9 +58,46 @@ class Settings(BaseSettings):
     # Hidden Message (Stored as JSON list string in env)
     HIDDEN_MESSAGES: List[str] = []
 
+    # Game record ingestion: "direct" (commit per request) or "batched" (group commit)
+    RECORD_INGEST_MODE: str = "direct"
+    RECORD_BATCH_MAX_SIZE: int = 100  # Records per transaction
+    RECORD_BATCH_MAX_WAIT_MS: float = 5  # Max wait after the first queued record
+
+    # Ranking broadcast (Socket.IO 'ranking_update')
+    RANKING_BROADCAST_INTERVAL_SECONDS: float = 1.0  # At most one emit per interval
+    RANKING_BROADCAST_DEPTH: int = 10  # Rows per live page (page 0 = top N)
+    RANKING_LIVE_PAGES: int = 10  # Pages clients can subscribe to ('subscribe_page')
+    # Players pushed down by a submission who get a personal 'rank_changed' (nearest first, 0 disables)
+    RANKING_RANK_CHANGED_LIMIT: int = 10
+
+    # Leaderboard engine: "redis" (shared ZSETs) or "memory" (in-process, single worker only;
+    # pair with SOCKETIO_REDIS_MANAGER=false to run without Redis)
+    LEADERBOARD_BACKEND: str = "redis"
+    LEADERBOARD_SNAPSHOT_PATH: str = "./data/leaderboard.json"  # memory backend
+    LEADERBOARD_SNAPSHOT_INTERVAL_SECONDS: float = 60  # 0 = only on shutdown
+
+    # Daily / weekly leaderboard windows start at local midnight (Monday for weeks)
+    RANKING_TIMEZONE_OFFSET_HOURS: int = 9  # Fixed UTC offset (KST)
+    # Best-time histogram bucket width; rerun migrate_redis after changing it
+    RANKING_HISTOGRAM_BUCKET_MS: int = 5000
+
+    # Serialized GET /ranks pages keyed by (board window, skip, limit, version), the window being the
+    # board's rank key (e.g. game_ranks:daily:2026-10-17). Size 0 disables it.
+    RANKING_PAGE_CACHE_MAX_SIZE: int = 256
+    RANKING_PAGE_CACHE_TTL_SECONDS: int = 300
+
+    # Per-request profiling (Server-Timing header, query budget / N+1 warnings)
+    PROFILING_ENABLED: bool = False
+    PROFILING_QUERY_BUDGET: int = 5  # Warn above this many SQL queries per request
+    PROFILING_N_PLUS_ONE_THRESHOLD: int = 3  # Warn when one statement repeats this often
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_JSON_FORMAT: bool = False
+    # "production" turns down Socket.IO / engine.io per-packet logging
+    LOG_PROFILE: str = "development"
+    # Fraction of successful (< 400) access logs to keep; errors are always logged
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0
 
     @field_validator("BACKEND_CORS_ORIGINS", mode='before')
     @classmethod
@@ -0,0 +1,36 @@
+from app.core.config import settings
+from app.core.leaderboard.base import (
+    ALL_TIME,
+    BROADCAST_KEY,
+    HISTOGRAM_KEY,
+    META_KEY,
+    PERIODS,
+    RANK_KEY,
+    VERSION_KEY,
+    Board,
+    LeaderboardBackend,
+    RecordResult,
+    build_meta,
+    build_rows,
+    format_record,
+    get_board,
+    histogram_bucket,
+    percentile,
+)
+
+
+def create_leaderboard(backend: str) -> LeaderboardBackend:
+    """Leaderboard engine by name: "redis" (shared ZSETs) or "memory" (in-process, single worker)"""
+    if backend == "redis":
+        from app.core.leaderboard.redis_backend import RedisLeaderboard
+        return RedisLeaderboard()
+    if backend == "memory":
+        from app.core.leaderboard.memory_backend import MemoryLeaderboard
+        return MemoryLeaderboard(
+            snapshot_path=settings.LEADERBOARD_SNAPSHOT_PATH,
+            snapshot_interval=settings.LEADERBOARD_SNAPSHOT_INTERVAL_SECONDS
+        )
+    raise ValueError(f"Unknown leaderboard backend: {backend}")
+
+
+leaderboard = create_leaderboard(settings.LEADERBOARD_BACKEND)
@@ -0,0 +1,176 @@
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.utils.masking import mask_name
+
+# Board keys (Redis key names; the in-process backend uses them as board ids)
+# game_ranks      : ZSET  member=user_id, score=best clear_time_ms (lower is better)
+# game_ranks:meta : HASH  field=user_id, value=JSON {"name": <masked name>, "date": "YYYY-MM-DD"}
+# game_ranks:version : STRING  counter bumped whenever game_ranks changes
+# game_ranks:histogram : HASH field=bucket start ms, value=members whose best time falls in it
+RANK_KEY = "game_ranks"
+META_KEY = "game_ranks:meta"
+VERSION_KEY = "game_ranks:version"
+HISTOGRAM_KEY = "game_ranks:histogram"
+
+# Period boards use the same layout under game_ranks:<period>:<window>
+# (e.g. game_ranks:daily:2026-10-17, game_ranks:weekly:2026-W42) and expire
+# one period after their window closes.
+PERIODS = ("all", "daily", "weekly")
+
+# Last broadcast snapshot per live page, shared by all workers:
+# game_ranks:broadcast:<page> JSON {"version": int, "items": [...]}
+BROADCAST_KEY = "game_ranks:broadcast"
+
+
+@dataclass(frozen=True)
+class Board:
+    rank_key: str
+    meta_key: str
+    version_key: str
+    histogram_key: str
+    expire_at: int = 0  # Unix time, 0 = never expires
+
+    @property
+    def keys(self) -> List[str]:
+        return [self.rank_key, self.meta_key, self.version_key, self.histogram_key]
+
+
+ALL_TIME = Board(RANK_KEY, META_KEY, VERSION_KEY, HISTOGRAM_KEY)
+
+
+def get_board(period: str, at: Optional[datetime] = None) -> Board:
+    """Keys of the `period` board whose window contains `at` (default: now)"""
+    if period == "all":
+        return ALL_TIME
+
+    tz = timezone(timedelta(hours=settings.RANKING_TIMEZONE_OFFSET_HOURS))
+    local = (at or datetime.now(timezone.utc)).astimezone(tz)
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "daily":
+        start, length = midnight, timedelta(days=1)
+        window = start.strftime("%Y-%m-%d")
+    elif period == "weekly":
+        start, length = midnight - timedelta(days=local.weekday()), timedelta(weeks=1)
+        year, week, _ = start.isocalendar()
+        window = f"{year}-W{week:02d}"
+    else:
+        raise ValueError(f"Unknown leaderboard period: {period}")
+
+    rank_key = f"{RANK_KEY}:{period}:{window}"
+    return Board(
+        rank_key, f"{rank_key}:meta", f"{rank_key}:version", f"{rank_key}:histogram",
+        int((start + 2 * length).timestamp())
+    )
+
+
+def histogram_bucket(score_ms: float) -> int:
+    """Start (ms) of the histogram bucket containing a clear time"""
+    bucket_ms = settings.RANKING_HISTOGRAM_BUCKET_MS
+    return int(score_ms) // bucket_ms * bucket_ms
+
+
+def format_record(score: float) -> str:
+    return f"{score / 1000:.2f}"
+
+
+def build_meta(name: str, played_at: Optional[datetime]) -> str:
+    """Serialize the read-model entry stored next to the ZSET member"""
+    return json.dumps({
+        "name": mask_name(name),
+        "date": played_at.strftime("%Y-%m-%d") if played_at else ""
+    }, ensure_ascii=False)
+
+
+def percentile(rank: int, total: int) -> float:
+    """Share of ranked players (%) with a slower best time than `rank`"""
+    return round(100 * (total - rank) / total, 1) if total else 0.0
+
+
+def build_rows(records: List[Tuple[str, float]], metas: List[Optional[str]], skip: int = 0) -> List[dict]:
+    """Ranking rows from a board range [(member, score)] starting at `skip` and its metadata"""
+    ranking_list = []
+    for i, ((uid, score), meta) in enumerate(zip(records, metas)):
+        info = json.loads(meta if meta else build_meta("Unknown", None))
+        ranking_list.append({
+            "rank": skip + i + 1,
+            "userId": uid,
+            "name": info["name"],
+            "record": format_record(score),
+            "date": info["date"]
+        })
+    return ranking_list
+
+
+class RecordResult(NamedTuple):
+    """Outcome of a submission on the all-time board"""
+    changed: int  # 1 if the best time improved (or is new), else 0
+    rank: int
+    version: int
+    top: List[Tuple[str, float]]  # Top-N [(member, score)] if changed and in the top N, else []
+    previous_rank: Optional[int]  # Rank before the submission, None if new
+    displaced: List[Tuple[str, float, int]]  # [(member, score, new rank)] pushed down one place
+
+
+class LeaderboardBackend(ABC):
+    """
+    Storage engine for the all-time and period boards.
+    Ranks are 1-based; members are user ids as strings; scores are best clear times (ms).
+    """
+
+    async def start(self):
+        """Prepare the backend (called from the app lifespan)"""
+
+    async def stop(self):
+        """Release / persist state (called from the app lifespan)"""
+
+    @abstractmethod
+    async def record(
+        self, user_id: int, name: str, clear_time_ms: int, played_at: datetime, top_n: int, displaced_limit: int = 0
+    ) -> RecordResult:
+        """
+        Update the user's best time and, if it improved, the row metadata
+        on the all-time board and the period boards containing `played_at`.
+        `displaced` lists at most `displaced_limit` players the improvement
+        pushed down, nearest first.
+        """
+
+    @abstractmethod
+    async def rows(self, records: List[Tuple[str, float]], skip: int = 0, db: Optional[AsyncSession] = None) -> List[dict]:
+        """Ranking rows for an all-time board range [(member, score)] starting at `skip`"""
+
+    @abstractmethod
+    async def page(
+        self, skip: int, limit: int, period: str = "all", db: Optional[AsyncSession] = None
+    ) -> Tuple[List[dict], int, int]:
+        """A ranking page as (items, total, version)"""
+
+    @abstractmethod
+    async def version(self, period: str = "all") -> int:
+        """Current version of a board (bumped on every change)"""
+
+    @abstractmethod
+    async def member_rank(self, user_id: int, period: str = "all") -> Optional[Tuple[int, float]]:
+        """(rank, best time ms) of a user on a board, or None if unranked"""
+
+    @abstractmethod
+    async def around(self, user_id: int, k: int, period: str = "all") -> Tuple[List[dict], int, int]:
+        """Rows within k places of a user as (items, rank, total), or ([], 0, total) if unranked"""
+
+    @abstractmethod
+    async def histogram(self, period: str = "all") -> List[Tuple[int, int]]:
+        """Precomputed [(bucket start ms, players)] of a board, fastest bucket first"""
+
+    @abstractmethod
+    async def load_broadcast(self, page: int = 0) -> Optional[dict]:
+        """Last broadcast snapshot {"version", "items"} of a page (shared by workers where supported)"""
+
+    @abstractmethod
+    async def store_broadcast(self, snapshot: dict, page: int = 0):
+        """Replace the last broadcast snapshot of a page"""
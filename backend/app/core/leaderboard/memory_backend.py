@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.leaderboard.base import (
+    PERIODS, Board, LeaderboardBackend, RecordResult, build_meta, build_rows, get_board, histogram_bucket
+)
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.game import UserBestRecord
+from app.utils.skiplist import IndexableSkipList
+
+logger = logging.getLogger(__name__)
+
+
+class _MemoryBoard:
+    """One board: (score, member) order statistics plus metadata, version and histogram"""
+
+    def __init__(self, expire_at: int = 0):
+        self.expire_at = expire_at
+        # Same order as a Redis ZSET: by score, then member
+        self.order = IndexableSkipList()
+        self.scores: Dict[str, float] = {}
+        self.meta: Dict[str, str] = {}
+        self.version = 0
+        self.histogram: Counter = Counter()
+
+    def update(self, member: str, score: float, meta: str) -> bool:
+        """ZADD LT semantics: keep the lower score. Returns True if it changed."""
+        old = self.scores.get(member)
+        if old is not None and score >= old:
+            return False
+        if old is not None:
+            self.order.remove((old, member))
+            self.histogram[histogram_bucket(old)] -= 1
+        self.order.insert((score, member))
+        self.scores[member] = score
+        self.meta[member] = meta
+        self.histogram[histogram_bucket(score)] += 1
+        self.version += 1
+        return True
+
+    def range(self, start: int, stop: int) -> List[Tuple[str, float]]:
+        return [(member, score) for score, member in self.order.range(start, stop)]
+
+    def rank(self, member: str) -> Optional[int]:
+        """0-based rank of a member, or None"""
+        score = self.scores.get(member)
+        return None if score is None else self.order.rank((score, member))
+
+    def rows(self, records: List[Tuple[str, float]], skip: int) -> List[dict]:
+        return build_rows(records, [self.meta.get(uid) for uid, _ in records], skip)
+
+
+class MemoryLeaderboard(LeaderboardBackend):
+    """
+    Boards kept in process memory (single worker only), with O(log n)
+    update, rank and range. State is persisted as a JSON snapshot on
+    shutdown and every `snapshot_interval` seconds; without a snapshot the
+    all-time board is rebuilt from user_best_records at startup.
+    """
+
+    def __init__(self, snapshot_path: str, snapshot_interval: float):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._boards: Dict[str, _MemoryBoard] = {}
+        self._broadcast: Dict[int, dict] = {}  # page -> last broadcast snapshot
+        self._changes = 0  # Updates since the last snapshot
+        self._task: Optional[asyncio.Task] = None
+
+    def _board(self, board: Board, create: bool = False) -> Optional[_MemoryBoard]:
+        state = self._boards.get(board.rank_key)
+        if state is not None and state.expire_at and state.expire_at <= time.time():
+            del self._boards[board.rank_key]
+            state = None
+        if state is None and create:
+            state = self._boards[board.rank_key] = _MemoryBoard(board.expire_at)
+        return state
+
+    async def start(self):
+        if not self.load_snapshot():
+            await self._load_from_db()
+        if self.snapshot_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.save_snapshot()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                await self.save_snapshot()
+            except Exception:
+                logger.exception("Leaderboard snapshot failed")
+
+    async def _load_from_db(self, chunk_size: int = 5000):
+        board = self._board(get_board("all"), create=True)
+        async with SessionLocal() as db:
+            result = await db.stream(
+                select(UserBestRecord.user_id, UserBestRecord.best_time_ms, UserBestRecord.played_at, User.name)
+                .join(User, User.id == UserBestRecord.user_id)
+                .execution_options(yield_per=chunk_size)
+            )
+            async for rows in result.partitions(chunk_size):
+                for row in rows:
+                    board.update(str(row.user_id), float(row.best_time_ms), build_meta(row.name, row.played_at))
+        logger.info(f"Leaderboard loaded {len(board.scores)} members from the database")
+
+    def load_snapshot(self) -> bool:
+        """Restore boards from the snapshot file. Returns False if there is none."""
+        if not os.path.exists(self.snapshot_path):
+            return False
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+
+        now = time.time()
+        self._boards = {}
+        for key, data in snapshot["boards"].items():
+            if data["expireAt"] and data["expireAt"] <= now:
+                continue
+            board = self._boards[key] = _MemoryBoard(data["expireAt"])
+            for member, score in data["scores"].items():
+                board.update(member, float(score), data["meta"].get(member))
+            board.version = data["version"]
+        self._broadcast = {int(page): data for page, data in snapshot.get("broadcast", {}).items()}
+        return True
+
+    async def save_snapshot(self):
+        """Write all boards to the snapshot file (skipped if nothing changed)"""
+        if self._changes == 0 and os.path.exists(self.snapshot_path):
+            return
+        snapshot = {
+            "boards": {
+                key: {
+                    "expireAt": board.expire_at,
+                    "version": board.version,
+                    "scores": dict(board.scores),
+                    "meta": dict(board.meta),
+                }
+                for key, board in self._boards.items()
+            },
+            "broadcast": {str(page): data for page, data in self._broadcast.items()},
+        }
+        self._changes = 0
+        await asyncio.to_thread(self._write_snapshot, snapshot)
+
+    def _write_snapshot(self, snapshot: dict):
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+    async def record(
+        self, user_id: int, name: str, clear_time_ms: int, played_at: datetime, top_n: int, displaced_limit: int = 0
+    ) -> RecordResult:
+        member, meta = str(user_id), build_meta(name, played_at)
+        all_time = self._board(get_board("all"))
+        old_rank = all_time.rank(member) if all_time else None
+
+        changed = 0
+        for period in PERIODS:
+            board = get_board(period, played_at)
+            if self._board(board, create=True).update(member, float(clear_time_ms), meta):
+                self._changes += 1
+                if period == "all":
+                    changed = 1
+
+        board = self._board(get_board("all"))
+        rank_index = board.rank(member)
+        top = board.range(0, top_n) if changed and rank_index < top_n else []
+
+        displaced = []
+        if changed:
+            last = rank_index + displaced_limit if old_rank is None else min(old_rank, rank_index + displaced_limit)
+            displaced = [
+                (uid, score, rank_index + 2 + i) for i, (uid, score) in enumerate(board.range(rank_index + 1, last + 1))
+            ]
+        return RecordResult(
+            changed, rank_index + 1, board.version, top, old_rank + 1 if old_rank is not None else None, displaced
+        )
+
+    async def rows(self, records: List[Tuple[str, float]], skip: int = 0, db: Optional[AsyncSession] = None) -> List[dict]:
+        board = self._board(get_board("all"))
+        return board.rows(records, skip) if board else build_rows(records, [None] * len(records), skip)
+
+    async def page(
+        self, skip: int, limit: int, period: str = "all", db: Optional[AsyncSession] = None
+    ) -> Tuple[List[dict], int, int]:
+        board = self._board(get_board(period))
+        if board is None:
+            return [], 0, 0
+        return board.rows(board.range(skip, skip + limit), skip), len(board.order), board.version
+
+    async def version(self, period: str = "all") -> int:
+        board = self._board(get_board(period))
+        return board.version if board else 0
+
+    async def member_rank(self, user_id: int, period: str = "all") -> Optional[Tuple[int, float]]:
+        board = self._board(get_board(period))
+        rank_index = board.rank(str(user_id)) if board else None
+        if rank_index is None:
+            return None
+        return rank_index + 1, board.scores[str(user_id)]
+
+    async def around(self, user_id: int, k: int, period: str = "all") -> Tuple[List[dict], int, int]:
+        board = self._board(get_board(period))
+        if board is None:
+            return [], 0, 0
+        rank_index = board.rank(str(user_id))
+        if rank_index is None:
+            return [], 0, len(board.order)
+
+        start = max(rank_index - k, 0)
+        return board.rows(board.range(start, rank_index + k + 1), start), rank_index + 1, len(board.order)
+
+    async def histogram(self, period: str = "all") -> List[Tuple[int, int]]:
+        board = self._board(get_board(period))
+        if board is None:
+            return []
+        return sorted((bucket, count) for bucket, count in board.histogram.items() if count > 0)
+
+    async def load_broadcast(self, page: int = 0) -> Optional[dict]:
+        return self._broadcast.get(page)
+
+    async def store_broadcast(self, snapshot: dict, page: int = 0):
+        self._broadcast[page] = snapshot
+        self._changes += 1
@@ -0,0 +1,210 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.user import User
+from app.models.game import UserBestRecord
+from app.core.leaderboard.base import (
+    BROADCAST_KEY, META_KEY, PERIODS, LeaderboardBackend, RecordResult, build_meta, build_rows, get_board
+)
+
+
+# Atomically record a submission on every board in one round trip:
+# ZADD LT CH (keep best time); if it improved, update metadata, version and move
+# the member between histogram buckets; refresh the expiry of period boards.
+# Returns, for the first (all-time) board, {changed, 0-based rank, version,
+# top-N slice (only if changed and in top N), previous 0-based rank (-1 if new),
+# members pushed down one place (up to displaced_limit, with scores)}.
+# KEYS: (rank zset, meta hash, version counter, histogram hash) per board
+# ARGV: member, score, meta json, top_n, bucket ms, displaced_limit, then one expire-at (0 = never) per board
+RECORD_SCRIPT = """
+local bucket_ms = tonumber(ARGV[5])
+local result
+for b = 1, #KEYS / 4 do
+    local rank_key, meta_key, version_key, histogram_key = KEYS[b * 4 - 3], KEYS[b * 4 - 2], KEYS[b * 4 - 1], KEYS[b * 4]
+    local old = redis.call('ZSCORE', rank_key, ARGV[1])
+    local old_rank = -1
+    if b == 1 and old then
+        old_rank = redis.call('ZRANK', rank_key, ARGV[1])
+    end
+    local changed = redis.call('ZADD', rank_key, 'LT', 'CH', ARGV[2], ARGV[1])
+    local version = tonumber(redis.call('GET', version_key) or '0')
+    if changed > 0 then
+        redis.call('HSET', meta_key, ARGV[1], ARGV[3])
+        version = redis.call('INCR', version_key)
+        if old then
+            local old_bucket = math.floor(tonumber(old) / bucket_ms) * bucket_ms
+            if redis.call('HINCRBY', histogram_key, old_bucket, -1) <= 0 then
+                redis.call('HDEL', histogram_key, old_bucket)
+            end
+        end
+        redis.call('HINCRBY', histogram_key, math.floor(tonumber(ARGV[2]) / bucket_ms) * bucket_ms, 1)
+    end
+    local expire_at = tonumber(ARGV[6 + b])
+    if expire_at > 0 then
+        redis.call('EXPIREAT', rank_key, expire_at)
+        redis.call('EXPIREAT', meta_key, expire_at)
+        redis.call('EXPIREAT', version_key, expire_at)
+        redis.call('EXPIREAT', histogram_key, expire_at)
+    end
+    if b == 1 then
+        local rank = redis.call('ZRANK', rank_key, ARGV[1])
+        local top = {}
+        local top_n = tonumber(ARGV[4])
+        if changed > 0 and rank < top_n then
+            top = redis.call('ZRANGE', rank_key, 0, top_n - 1, 'WITHSCORES')
+        end
+        local displaced = {}
+        local last = rank + tonumber(ARGV[6])
+        if old_rank >= 0 and old_rank < last then
+            last = old_rank
+        end
+        if changed > 0 and last > rank then
+            displaced = redis.call('ZRANGE', rank_key, rank + 1, last, 'WITHSCORES')
+        end
+        result = {changed, rank, version, top, old_rank, displaced}
+    end
+end
+return result
+"""
+
+# Rank, board size and the +-k neighbourhood of a member in one round trip.
+# Returns {0-based rank, total, range start, range with scores} or {-1, total, 0, {}}.
+# KEYS: rank zset
+# ARGV: member, k
+AROUND_SCRIPT = """
+local total = redis.call('ZCARD', KEYS[1])
+local rank = redis.call('ZRANK', KEYS[1], ARGV[1])
+if not rank then
+    return {-1, total, 0, {}}
+end
+local k = tonumber(ARGV[2])
+local start = math.max(rank - k, 0)
+return {rank, total, start, redis.call('ZRANGE', KEYS[1], start, rank + k, 'WITHSCORES')}
+"""
+
+_record_script = redis_client.register_script(RECORD_SCRIPT)
+_around_script = redis_client.register_script(AROUND_SCRIPT)
+
+
+async def _load_missing_meta(db: AsyncSession, user_ids: List[int]) -> Dict[int, str]:
+    """Backfill metadata for members written before the read model existed"""
+    result = await db.execute(
+        select(User.id, User.name, UserBestRecord.played_at)
+        .outerjoin(UserBestRecord, UserBestRecord.user_id == User.id)
+        .where(User.id.in_(user_ids))
+    )
+    rows = {row.id: row for row in result.all()}
+
+    return {
+        uid: build_meta(rows[uid].name, rows[uid].played_at) if uid in rows else build_meta("Unknown", None)
+        for uid in user_ids
+    }
+
+
+def _pairs(flat: list) -> List[Tuple[str, float]]:
+    return [(flat[i], float(flat[i + 1])) for i in range(0, len(flat), 2)]
+
+
+class RedisLeaderboard(LeaderboardBackend):
+    """Boards as Redis ZSETs with a metadata hash, version counter and histogram hash each"""
+
+    async def start(self):
+        # Load Lua scripts at startup so requests only send EVALSHA
+        await redis_client.script_load(RECORD_SCRIPT)
+        await redis_client.script_load(AROUND_SCRIPT)
+
+    async def record(
+        self, user_id: int, name: str, clear_time_ms: int, played_at: datetime, top_n: int, displaced_limit: int = 0
+    ) -> RecordResult:
+        boards = [get_board(period, played_at) for period in PERIODS]
+        changed, rank_index, version, flat_top, old_rank, flat_displaced = await _record_script(
+            keys=[key for board in boards for key in board.keys],
+            args=[
+                str(user_id), clear_time_ms, build_meta(name, played_at), top_n,
+                settings.RANKING_HISTOGRAM_BUCKET_MS, displaced_limit
+            ] + [board.expire_at for board in boards]
+        )
+        displaced = [
+            (member, score, rank_index + 2 + i) for i, (member, score) in enumerate(_pairs(flat_displaced))
+        ]
+        return RecordResult(
+            changed, rank_index + 1, version, _pairs(flat_top), old_rank + 1 if old_rank >= 0 else None, displaced
+        )
+
+    async def _rows(
+        self, records: List[Tuple[str, float]], skip: int, db: Optional[AsyncSession], meta_key: str
+    ) -> List[dict]:
+        """
+        One HMGET for the cached metadata. If a DB session is given, members
+        without metadata are backfilled once (all-time board only).
+        """
+        if not records:
+            return []
+
+        members = [uid for uid, _ in records]
+        metas = await redis_client.hmget(meta_key, members)
+
+        missing = [int(uid) for uid, meta in zip(members, metas) if meta is None]
+        if missing and db is not None and meta_key == META_KEY:
+            loaded = await _load_missing_meta(db, missing)
+            await redis_client.hset(META_KEY, mapping={str(uid): meta for uid, meta in loaded.items()})
+            metas = [meta if meta is not None else loaded[int(uid)] for uid, meta in zip(members, metas)]
+
+        return build_rows(records, metas, skip)
+
+    async def rows(self, records: List[Tuple[str, float]], skip: int = 0, db: Optional[AsyncSession] = None) -> List[dict]:
+        return await self._rows(records, skip, db, META_KEY)
+
+    async def page(
+        self, skip: int, limit: int, period: str = "all", db: Optional[AsyncSession] = None
+    ) -> Tuple[List[dict], int, int]:
+        # One transaction for the range, total and board version, one HMGET for the rows
+        board = get_board(period)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrange(board.rank_key, skip, skip + limit - 1, withscores=True)
+            pipe.zcard(board.rank_key)
+            pipe.get(board.version_key)
+            top_records, total_count, version = await pipe.execute()
+
+        ranking_list = await self._rows(top_records, skip, db, board.meta_key)
+        return ranking_list, total_count, int(version or 0)
+
+    async def version(self, period: str = "all") -> int:
+        return int(await redis_client.get(get_board(period).version_key) or 0)
+
+    async def member_rank(self, user_id: int, period: str = "all") -> Optional[Tuple[int, float]]:
+        board = get_board(period)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zrank(board.rank_key, str(user_id))
+            pipe.zscore(board.rank_key, str(user_id))
+            rank_index, score = await pipe.execute()
+
+        if rank_index is None or score is None:
+            return None
+        return rank_index + 1, score
+
+    async def around(self, user_id: int, k: int, period: str = "all") -> Tuple[List[dict], int, int]:
+        # One script call plus one HMGET
+        board = get_board(period)
+        rank_index, total, start, flat_range = await _around_script(keys=[board.rank_key], args=[str(user_id), k])
+        if rank_index < 0:
+            return [], 0, total
+
+        return await self._rows(_pairs(flat_range), start, None, board.meta_key), rank_index + 1, total
+
+    async def histogram(self, period: str = "all") -> List[Tuple[int, int]]:
+        histogram = await redis_client.hgetall(get_board(period).histogram_key)
+        return sorted((int(bucket), int(count)) for bucket, count in histogram.items() if int(count) > 0)
+
+    async def load_broadcast(self, page: int = 0) -> Optional[dict]:
+        snapshot = await redis_client.get(f"{BROADCAST_KEY}:{page}")
+        return json.loads(snapshot) if snapshot else None
+
+    async def store_broadcast(self, snapshot: dict, page: int = 0):
+        await redis_client.set(f"{BROADCAST_KEY}:{page}", json.dumps(snapshot, ensure_ascii=False))
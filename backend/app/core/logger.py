@@ -1,12 +1,20 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from pythonjsonlogger import jsonlogger
 from app.core.config import settings
 
+# Formatting and stdout writes happen on the listener's thread, not the event loop
+_listener: Optional[QueueListener] = None
+
 def setup_logging():
     """
     Setup logging configuration
     """
+    global _listener
     log_level = settings.LOG_LEVEL.upper()
     
     # Root logger
@@ -14,8 +22,9 @@ def setup_logging():
     logger.setLevel(log_level)
     
     # Remove existing handlers
-    for handler in logger.handlers:
+    for handler in list(logger.handlers):
         logger.removeHandler(handler)
+    shutdown_logging()
         
     # Stream Handler (Stdout)
     handler = logging.StreamHandler(sys.stdout)
@@ -35,7 +44,26 @@ def setup_logging():
         )
         
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+
+    # Loggers only enqueue records; the listener thread formats and writes them
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
     
     # Set specific loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING) # Suppress default access log to avoid duplicate
+
+    if settings.LOG_PROFILE == "production":
+        # Per-packet Socket.IO / engine.io logs are too chatty under load
+        logging.getLogger("socketio").setLevel(logging.WARNING)
+        logging.getLogger("engineio").setLevel(logging.WARNING)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
@@ -1,42 +1,100 @@
+import random
 import time
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+from app.core.profiling import RequestProfile, profile_block, check_budget
 
 logger = logging.getLogger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+def _route_label(scope: Scope) -> str:
+    """Route template (e.g. /api/v1/ranks/my) to keep metric label cardinality bounded"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounted apps (Socket.IO) only leave their mount path behind
+    return scope.get("root_path") or "unmatched"
+
+def _sampled_out(status_code: int) -> bool:
+    """Drop a share of successful access logs (LOG_ACCESS_SAMPLE_RATE); errors are always logged"""
+    rate = settings.LOG_ACCESS_SAMPLE_RATE
+    return status_code < 400 and rate < 1 and random.random() >= rate
+
+class LoggingMiddleware:
+    """
+    Pure ASGI access-log and metrics middleware.
+    (BaseHTTPMiddleware wraps every request in an extra task and response stream.)
+    With PROFILING_ENABLED it also profiles each request (Server-Timing header,
+    query budget and N+1 warnings).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if settings.PROFILING_ENABLED:
+            with profile_block() as profile:
+                await self._handle(scope, receive, send, profile)
+        else:
+            await self._handle(scope, receive, send, None)
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send, profile: Optional[RequestProfile]):
+        method = scope["method"]
+        path = scope["path"]
+        status_code = 500
         start_time = time.perf_counter()
-        
-        # Log Request (Optional, can be noisy)
-        # logger.info(f"Request started: {request.method} {request.url.path}")
-        
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile is not None:
+                    timing = profile.server_timing()
+                    if profile.db_queries > settings.PROFILING_QUERY_BUDGET:
+                        timing += ', budget;desc="exceeded"'
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
             process_time = time.perf_counter() - start_time
-            
-            # Log Response
-            logger.info(
-                f"{request.method} {request.url.path} - {response.status_code} - {process_time:.4f}s",
+            logger.error(
+                f"Request failed: {method} {path} - {process_time:.4f}s",
+                exc_info=True,
                 extra={
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
+                    "method": method,
+                    "path": path,
                     "duration": process_time
                 }
             )
-            
-            return response
-        except Exception as e:
+            raise
+        else:
+            if _sampled_out(status_code):
+                return
             process_time = time.perf_counter() - start_time
-            logger.error(
-                f"Request failed: {request.method} {request.url.path} - {process_time:.4f}s",
-                exc_info=True,
+            logger.info(
+                f"{method} {path} - {status_code} - {process_time:.4f}s",
                 extra={
-                    "method": request.method,
-                    "path": request.url.path,
+                    "method": method,
+                    "path": path,
+                    "status_code": status_code,
                     "duration": process_time
                 }
             )
-            raise e
+        finally:
+            process_time = time.perf_counter() - start_time
+            route = _route_label(scope)
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_REQUEST_DURATION.observe(process_time, method, route)
+            if profile is not None:
+                check_budget(profile, f"{method} {route}")
@@ -0,0 +1,143 @@
+"""
+Opt-in per-request instrumentation (PROFILING_ENABLED).
+
+SQLAlchemy engine events and a wrapper around the Redis client count and time
+every SQL statement and Redis round trip made while a RequestProfile is active.
+LoggingMiddleware activates one per request and reports it in a Server-Timing
+header; tests and benchmarks can use profile_block() directly.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestProfile:
+    db_queries: int = 0
+    db_time: float = 0.0
+    redis_calls: int = 0  # Round trips (a pipeline or script call counts once)
+    redis_commands: int = 0
+    redis_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated_statements(self, threshold: int) -> List[str]:
+        """Statements executed at least `threshold` times: likely N+1 loops"""
+        return [statement for statement, count in self.statements.items() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_queries} queries", '
+            f'redis;dur={self.redis_time * 1000:.2f};desc="{self.redis_calls} calls"'
+        )
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_block() -> Iterator[RequestProfile]:
+    """Count queries and Redis calls made inside the block (in this task and tasks it awaits)"""
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def check_budget(profile: RequestProfile, label: str) -> List[str]:
+    """Log and return the problems found in a profile (query budget, repeated statements)"""
+    problems = []
+    if profile.db_queries > settings.PROFILING_QUERY_BUDGET:
+        problems.append(f"{profile.db_queries} queries (budget {settings.PROFILING_QUERY_BUDGET})")
+    for statement in profile.repeated_statements(settings.PROFILING_N_PLUS_ONE_THRESHOLD):
+        problems.append(f"possible N+1: {profile.statements[statement]}x {statement[:120]}")
+    for problem in problems:
+        logger.warning(f"{label}: {problem}")
+    return problems
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    starts = conn.info.get("profile_query_start")
+    if starts:
+        profile.db_time += time.perf_counter() - starts.pop()
+    profile.db_queries += 1
+    profile.statements[statement] += 1
+
+
+def install_db_hooks(*engines):
+    """Attach query counting to the given (async) engines; safe to call more than once"""
+    for engine in {e.sync_engine for e in engines}:
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def install_redis_hooks(client):
+    """Wrap a redis.asyncio client so commands and pipelines are counted and timed"""
+    if getattr(client, "_profiling_installed", False):
+        return
+    client._profiling_installed = True
+
+    execute_command = client.execute_command
+
+    async def profiled_execute_command(*args, **options):
+        profile = _current_profile.get()
+        if profile is None:
+            return await execute_command(*args, **options)
+        started = time.perf_counter()
+        try:
+            return await execute_command(*args, **options)
+        finally:
+            profile.redis_time += time.perf_counter() - started
+            profile.redis_calls += 1
+            profile.redis_commands += 1
+
+    client.execute_command = profiled_execute_command
+
+    make_pipeline = client.pipeline
+
+    def profiled_pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def profiled_execute(*execute_args, **execute_kwargs):
+            profile = _current_profile.get()
+            if profile is None:
+                return await execute(*execute_args, **execute_kwargs)
+            commands = len(pipe.command_stack)
+            started = time.perf_counter()
+            try:
+                return await execute(*execute_args, **execute_kwargs)
+            finally:
+                profile.redis_time += time.perf_counter() - started
+                profile.redis_calls += 1
+                profile.redis_commands += commands
+
+        pipe.execute = profiled_execute
+        return pipe
+
+    client.pipeline = profiled_pipeline
@@ -1,10 +1,51 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
 import boto3
 from botocore.exceptions import ClientError
 from app.core.config import settings
 
 from botocore.config import Config
 
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+class LocalS3Client:
+    """
+    Filesystem stand-in for the subset of the boto3 S3 client we use.
+    Objects are the files under `root`; presigned URLs are file:// URLs.
+    Used when S3_LOCAL_DIR is set (offline development and benchmarks).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def list_objects_v2(self, Bucket: str, **kwargs) -> dict:
+        contents = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                contents.append({"Key": os.path.relpath(path, self.root).replace(os.sep, "/"), "Size": os.path.getsize(path)})
+        return {"Contents": contents, "IsTruncated": False}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict, ExpiresIn: int) -> str:
+        path = os.path.abspath(os.path.join(self.root, Params["Key"]))
+        return f"file://{quote(path)}?Expires={int(time.time()) + ExpiresIn}"
+
+
+@lru_cache(maxsize=1)
 def get_s3_client():
+    """Shared S3 client (boto3 clients are thread-safe, so one per process is enough)"""
+    if settings.S3_LOCAL_DIR:
+        return LocalS3Client(settings.S3_LOCAL_DIR)
     return boto3.client(
         's3',
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
@@ -14,31 +55,127 @@ def get_s3_client():
         config=Config(signature_version='s3v4')
     )
 
-def create_presigned_url(object_name: str, expiration: int = 600) -> str:
+def create_presigned_url(object_name: str, expiration: int = 600, s3_client=None) -> str:
     """Generate a presigned URL to share an S3 object
 
     :param object_name: string
     :param expiration: Time in seconds for the presigned URL to remain valid
+    :param s3_client: Client to use (defaults to the shared client)
     :return: Presigned URL as string. If error, returns None.
     """
-    s3_client = get_s3_client()
+    s3_client = s3_client or get_s3_client()
     try:
         response = s3_client.generate_presigned_url('get_object',
                                                     Params={'Bucket': settings.S3_BUCKET_NAME,
                                                             'Key': object_name},
                                                     ExpiresIn=expiration)
     except ClientError as e:
-        print(f"Error generating presigned URL: {e}")
+        logger.error(f"Error generating presigned URL: {e}")
         return None
 
     return response
 
-def list_objects():
-    """List objects in the configured bucket"""
-    s3_client = get_s3_client()
-    try:
-        response = s3_client.list_objects_v2(Bucket=settings.S3_BUCKET_NAME)
-        return response.get('Contents', [])
-    except ClientError as e:
-        print(f"Error listing objects: {e}")
-        return []
+def list_objects(s3_client=None):
+    """List objects in the configured bucket (all pages). Raises ClientError on failure."""
+    s3_client = s3_client or get_s3_client()
+    objects = []
+    kwargs = {"Bucket": settings.S3_BUCKET_NAME}
+    while True:
+        response = s3_client.list_objects_v2(**kwargs)
+        objects.extend(response.get('Contents', []))
+        if not response.get('IsTruncated'):
+            return objects
+        kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+
+class PuzzleCatalog:
+    """
+    Cached puzzle image catalog.
+    - The image key list is refreshed in the background once it is older than `ttl`
+      (requests keep being served from the previous list meanwhile).
+    - A failed listing keeps the previous list and is retried after `retry_interval`.
+    - Presigned URLs are reused until `url_refresh_margin` seconds before they expire.
+    - boto3 calls (and creating the client) run in a worker thread so they never block the event loop.
+    """
+
+    def __init__(
+        self, ttl: float, url_expiration: int, url_refresh_margin: int, retry_interval: float = 10,
+        client_factory=get_s3_client
+    ):
+        self.client_factory = client_factory
+        self.ttl = ttl
+        self.url_expiration = url_expiration
+        self.url_refresh_margin = url_refresh_margin
+        self.retry_interval = retry_interval
+        self._keys: List[str] = []
+        self._loaded = False
+        self._refresh_at = 0.0  # Monotonic time the key list is due for a (re)load
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._urls: Dict[str, Tuple[str, float]] = {}  # key -> (url, expires_at)
+
+    def _list_image_keys(self) -> List[str]:
+        objects = list_objects(self.client_factory())
+        return [obj['Key'] for obj in objects if obj['Key'].lower().endswith(IMAGE_EXTENSIONS)]
+
+    async def refresh(self):
+        """Reload the key list. On failure the previous list is kept and the error is raised."""
+        try:
+            keys = await asyncio.to_thread(self._list_image_keys)
+        except Exception:
+            self._refresh_at = time.monotonic() + self.retry_interval
+            raise
+        self._keys = keys
+        self._loaded = True
+        self._refresh_at = time.monotonic() + self.ttl
+        # Drop cached URLs for removed images
+        keys = set(self._keys)
+        self._urls = {key: value for key, value in self._urls.items() if key in keys}
+
+    async def get_keys(self) -> List[str]:
+        if time.monotonic() < self._refresh_at:
+            return self._keys
+        if not self._loaded:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Puzzle catalog load failed")
+        elif self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+        return self._keys
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Puzzle catalog refresh failed")
+        finally:
+            self._refresh_task = None
+
+    async def get_url(self, key: str) -> Optional[str]:
+        cached = self._urls.get(key)
+        now = time.monotonic()
+        if cached and cached[1] - self.url_refresh_margin > now:
+            return cached[0]
+
+        url = await asyncio.to_thread(
+            lambda: create_presigned_url(key, self.url_expiration, self.client_factory())
+        )
+        if url:
+            self._urls[key] = (url, now + self.url_expiration)
+        return url
+
+    async def random_image_url(self) -> Tuple[Optional[str], Optional[str]]:
+        """Returns (key, url) for a random image; (None, None) if there are no images"""
+        keys = await self.get_keys()
+        if not keys:
+            return None, None
+        key = random.choice(keys)
+        return key, await self.get_url(key)
+
+
+puzzle_catalog = PuzzleCatalog(
+    ttl=settings.PUZZLE_CATALOG_TTL_SECONDS,
+    url_expiration=settings.PUZZLE_URL_EXPIRATION_SECONDS,
+    url_refresh_margin=settings.PUZZLE_URL_REFRESH_MARGIN_SECONDS,
+    retry_interval=settings.PUZZLE_CATALOG_RETRY_SECONDS
+)
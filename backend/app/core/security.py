@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Tuple, Union
+from jose import jwt, JWTError
 from app.core.config import settings
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
@@ -12,3 +12,11 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+def decode_access_token(token: str) -> Tuple[int, float]:
+    """Verify a token and return (user id, expiry as Unix time). Raises ValueError if invalid or expired."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return int(payload["sub"]), payload.get("exp", 0)
+    except (JWTError, KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid access token") from e
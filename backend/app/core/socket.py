@@ -1,17 +1,111 @@
+import logging
+from collections import Counter
+from typing import Dict
+
 import socketio
 
 # Create a Socket.IO server
 # cors_allowed_origins='*' allows all origins for development
 from app.core.config import settings
+from app.core.metrics import SOCKETIO_CONNECTIONS, SOCKETIO_CONNECTS
+from app.core.security import decode_access_token
+
+logger = logging.getLogger(__name__)
 
-mgr = socketio.AsyncRedisManager(settings.REDIS_URL)
-sio = socketio.AsyncServer(async_mode='asgi', client_manager=mgr, cors_allowed_origins='*', logger=True, engineio_logger=True)
+mgr = socketio.AsyncRedisManager(settings.REDIS_URL) if settings.SOCKETIO_REDIS_MANAGER else None
+# Logger objects rather than True/False: python-socketio then attaches no stderr handler of
+# its own, so its records go through the root QueueHandler at the levels setup_logging sets
+sio = socketio.AsyncServer(
+    async_mode='asgi', client_manager=mgr, cors_allowed_origins='*', serializer=settings.SOCKETIO_SERIALIZER,
+    logger=logging.getLogger("socketio.server"), engineio_logger=logging.getLogger("engineio.server")
+)
 
 
 # Create an ASGI app
 socket_app = socketio.ASGIApp(sio)
 
+# Live leaderboard pages: each socket follows one page (default 0, the top N)
+# and receives that page's 'ranking_update' patches via the room page:<n>
+_socket_pages: Dict[str, int] = {}
+page_subscribers: Counter = Counter()  # page -> sockets on this worker
+
+
+def user_room(user_id) -> str:
+    """Personal room of a signed-in user ('rank_changed' pushes)"""
+    return f"user:{user_id}"
+
+
+def page_room(page: int) -> str:
+    return f"page:{page}"
+
+
+def page_has_subscribers(page: int) -> bool:
+    """
+    Whether a page may have subscribers. Only known per worker, so with the
+    Redis manager (several workers) every live page counts as subscribed.
+    """
+    return mgr is not None or page_subscribers[page] > 0
+
+
+async def _follow_page(sid: str, page: int = None):
+    """Move a socket to another page room (None = no page)"""
+    previous = _socket_pages.pop(sid, None)
+    if previous is not None:
+        page_subscribers[previous] -= 1
+        await sio.leave_room(sid, page_room(previous), namespace='/ranking')
+    if page is not None:
+        _socket_pages[sid] = page
+        page_subscribers[page] += 1
+        await sio.enter_room(sid, page_room(page), namespace='/ranking')
+
+
 @sio.on('connect', namespace='/ranking')
-async def connect(sid, environ):
-    pass
+async def connect(sid, environ, auth=None):
+    SOCKETIO_CONNECTS.inc('/ranking')
+    SOCKETIO_CONNECTIONS.inc('/ranking')
+
+    # The board is public; clients that send {"token": <access token>} also join their personal room
+    token = auth.get("token") if isinstance(auth, dict) else None
+    if token:
+        try:
+            user_id, _ = decode_access_token(token)
+        except ValueError:
+            logger.debug(f"Socket {sid} sent an invalid token, connected anonymously")
+        else:
+            await sio.enter_room(sid, user_room(user_id), namespace='/ranking')
+
+    await _follow_page(sid, 0)
+    # Sent after the connect handshake completes
+    sio.start_background_task(send_snapshot, sid)
+
+async def send_snapshot(sid: str):
+    """Emit the current top N so new clients do not need GET /ranks"""
+    from app.core.broadcaster import ranking_broadcaster
+
+    try:
+        snapshot = await ranking_broadcaster.snapshot()
+    except Exception:
+        logger.exception("Ranking snapshot failed")
+        return
+    await sio.emit('ranking_snapshot', snapshot, to=sid, namespace='/ranking')
+
+@sio.on('subscribe_page', namespace='/ranking')
+async def subscribe_page(sid, data):
+    """{"page": n}: follow page n (ranks n*depth+1 .. (n+1)*depth) instead of the current one"""
+    page = data.get("page") if isinstance(data, dict) else None
+    if type(page) is not int or not 0 <= page < settings.RANKING_LIVE_PAGES:
+        return {"ok": False, "error": f"page must be 0..{settings.RANKING_LIVE_PAGES - 1}"}
+    await _follow_page(sid, page)
+    return {"ok": True, "page": page}
+
+@sio.on('unsubscribe_page', namespace='/ranking')
+async def unsubscribe_page(sid, data=None):
+    """Stop receiving 'ranking_update' patches"""
+    await _follow_page(sid, None)
+    return {"ok": True}
+
+@sio.on('disconnect', namespace='/ranking')
+async def disconnect(sid):
+    SOCKETIO_CONNECTIONS.dec('/ranking')
+    await _follow_page(sid, None)
 
@@ -2,3 +2,9 @@ from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
     pass
+
+def create_missing_indexes(connection):
+    """create_all() skips tables that already exist, so add indexes introduced later"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import upsert_best_records
+from app.models.game import GameRecord
+
+logger = logging.getLogger(__name__)
+
+# (user_id, clear_time_ms, played_at, future resolved with the record id)
+PendingRecord = Tuple[int, int, datetime, asyncio.Future]
+
+_STOP = None  # Queued by stop(): flush the batch being collected and exit
+
+
+class RecordWriteQueue:
+    """
+    Group-commit writer for game records (RECORD_INGEST_MODE=batched).
+    Submissions are queued and flushed in micro-batches: up to `max_batch` records,
+    waiting at most `max_wait_ms` after the first one. Each batch is a single
+    transaction (INSERT ... RETURNING for the records, one upsert for best records),
+    and every waiting request is resolved once its batch commits.
+    On shutdown everything queued before stop() is still written.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float, session_factory=SessionLocal):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.session_factory = session_factory
+        self._queue: "asyncio.Queue[Optional[PendingRecord]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def submit(self, user_id: int, clear_time_ms: int, played_at: datetime) -> int:
+        if self._task is None or self._stopping:
+            raise RuntimeError("Record write queue is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((user_id, clear_time_ms, played_at, future))
+        return await future
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # Queued behind every pending record, so _run flushes them (and its current batch) first
+        self._stopping = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = loop.time() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[PendingRecord]):
+        # One best-record row per user: best time (earliest on ties) and number of attempts
+        best = {}
+        for user_id, clear_time_ms, played_at, _ in batch:
+            row = best.get(user_id)
+            if row is None:
+                best[user_id] = {"user_id": user_id, "best_time_ms": clear_time_ms, "played_at": played_at, "attempts": 1}
+                continue
+            row["attempts"] += 1
+            if (clear_time_ms, played_at) < (row["best_time_ms"], row["played_at"]):
+                row["best_time_ms"], row["played_at"] = clear_time_ms, played_at
+
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    insert(GameRecord).returning(GameRecord.id, sort_by_parameter_order=True),
+                    [
+                        {"user_id": user_id, "clear_time_ms": clear_time_ms, "played_at": played_at}
+                        for user_id, clear_time_ms, played_at, _ in batch
+                    ]
+                )
+                record_ids = result.scalars().all()
+                await upsert_best_records(db, list(best.values()))
+                await db.commit()
+        except Exception as e:
+            logger.exception(f"Record batch of {len(batch)} failed")
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (*_, future), record_id in zip(batch, record_ids):
+            if not future.done():
+                future.set_result(record_id)
+
+
+record_write_queue = RecordWriteQueue(
+    max_batch=settings.RECORD_BATCH_MAX_SIZE,
+    max_wait_ms=settings.RECORD_BATCH_MAX_WAIT_MS
+)
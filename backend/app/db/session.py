@@ -1,9 +1,62 @@
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _create_engine(url: str, pool_size: int, max_overflow: int, read_only: bool = False):
+    tuned_sqlite = _is_sqlite(url) and settings.DB_STORAGE_PROFILE == "tuned"
+    options = {"echo": False}
+    if not _is_sqlite(url):
+        options.update(pool_size=pool_size, max_overflow=max_overflow)
+    elif tuned_sqlite:
+        # aiosqlite defaults to NullPool; keep connections (and their page cache) alive instead
+        options.update(poolclass=AsyncAdaptedQueuePool, pool_size=pool_size, max_overflow=max_overflow)
+    new_engine = create_async_engine(url, **options)
+
+    if tuned_sqlite:
+        pragmas = [
+            f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+            f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+            f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+            f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+            f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        ]
+        if read_only:
+            pragmas.append("PRAGMA query_only=ON")
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return new_engine
+
+# Write engine (and the default for everything)
+engine = _create_engine(settings.DATABASE_URL, settings.DB_WRITE_POOL_SIZE, settings.DB_WRITE_MAX_OVERFLOW)
 SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
 
+# Read engine for read-only endpoints: its own pool, so leaderboard/history reads
+# do not queue behind record writes (separate engine only in the "tuned" profile)
+if settings.DB_STORAGE_PROFILE == "tuned":
+    read_engine = _create_engine(
+        settings.DATABASE_READ_URL or settings.DATABASE_URL,
+        settings.DB_READ_POOL_SIZE,
+        settings.DB_READ_MAX_OVERFLOW,
+        read_only=True
+    )
+else:
+    read_engine = engine
+ReadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=AsyncSession)
+
 async def get_db():
     async with SessionLocal() as session:
         yield session
+
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        yield session
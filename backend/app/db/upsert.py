@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.game import UserBestRecord
+
+
+def dialect_insert(db: AsyncSession, table):
+    """Return an INSERT construct supporting ON CONFLICT for the session's dialect"""
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+async def upsert_best_records(db: AsyncSession, rows: List[dict]):
+    """
+    Insert or update best records in the current transaction (one statement).
+    Each row: user_id, best_time_ms, played_at, attempts; at most one row per user.
+    Ties keep the earlier played_at, so the date shown for a best time is stable.
+    """
+    stmt = dialect_insert(db, UserBestRecord).values(rows)
+    improved = stmt.excluded.best_time_ms < UserBestRecord.best_time_ms
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserBestRecord.user_id],
+        set_={
+            "best_time_ms": case((improved, stmt.excluded.best_time_ms), else_=UserBestRecord.best_time_ms),
+            "played_at": case((improved, stmt.excluded.played_at), else_=UserBestRecord.played_at),
+            "attempts": UserBestRecord.attempts + stmt.excluded.attempts,
+        }
+    )
+    await db.execute(stmt)
+
+
+async def upsert_best_record(db: AsyncSession, user_id: int, clear_time_ms: int, played_at: datetime, attempts: int = 1):
+    """Insert or update a single user's best record in the current transaction"""
+    await upsert_best_records(db, [{
+        "user_id": user_id,
+        "best_time_ms": clear_time_ms,
+        "played_at": played_at,
+        "attempts": attempts
+    }])
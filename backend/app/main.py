@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.socket import sio
@@ -6,10 +7,16 @@ import socketio
 
 from contextlib import asynccontextmanager
 import os
-from app.db.base import Base
-from app.db.session import engine
-from app.core.logger import setup_logging
+from app.db.base import Base, create_missing_indexes
+from app.db.session import engine, read_engine
+from app.core.redis import redis_client
+from app.core.profiling import install_db_hooks, install_redis_hooks
+from app.core.logger import setup_logging, shutdown_logging
 from app.core.middleware.logging_middleware import LoggingMiddleware
+from app.core.metrics import registry
+from app.core.broadcaster import ranking_broadcaster
+from app.core.leaderboard import leaderboard
+from app.db.record_queue import record_write_queue
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -23,8 +30,29 @@ async def lifespan(app: FastAPI):
     # Create tables if they don't exist
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
+
+    # Opt-in query / Redis profiling
+    if settings.PROFILING_ENABLED:
+        install_db_hooks(engine, read_engine)
+        install_redis_hooks(redis_client)
+
+    # Prepare the leaderboard engine (Redis: load Lua scripts; memory: load the snapshot)
+    await leaderboard.start()
+
+    # Start background ranking broadcaster
+    ranking_broadcaster.start()
+
+    # Start group-commit record writer
+    if settings.RECORD_INGEST_MODE == "batched":
+        record_write_queue.start()
     
     yield
+
+    await record_write_queue.stop()
+    await ranking_broadcaster.stop()
+    await leaderboard.stop()
+    shutdown_logging()
     
 app = FastAPI(
     title=settings.PROJECT_NAME, 
@@ -42,6 +70,10 @@ app.include_router(api_router, prefix=settings.SOS_API_PREFIX)
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Mount Socket.IO app
 # Using mount() allows us to run 'app' as the single entry point
 # We set socketio_path="" because the mount path "/socket.io" is already stripped by FastAPI
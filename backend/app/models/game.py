@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -9,3 +9,18 @@ class GameRecord(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     clear_time_ms = Column(Integer, index=True, nullable=False)
     played_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Personal history: sort by date, and rank by clear time within a user
+        Index("ix_game_records_user_id_played_at", "user_id", "played_at"),
+        Index("ix_game_records_user_id_clear_time_ms", "user_id", "clear_time_ms"),
+    )
+
+class UserBestRecord(Base):
+    """Denormalized best record per user, maintained together with every GameRecord insert"""
+    __tablename__ = "user_best_records"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    best_time_ms = Column(Integer, index=True, nullable=False)
+    played_at = Column(DateTime(timezone=True), nullable=False)  # First time the best time was reached
+    attempts = Column(Integer, nullable=False, default=1)
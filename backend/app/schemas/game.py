@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 class GameRecordCreate(BaseModel):
@@ -20,4 +21,5 @@ class GameHistoryItem(BaseModel):
 
 class GameHistoryResponse(BaseModel):
     items: list[GameHistoryItem]
-    total: int
+    total: Optional[int] = None  # Records of the user; not counted on cursor pages
+    nextCursor: Optional[str] = None  # Pass as `cursor` to fetch the next page (keyset pagination)
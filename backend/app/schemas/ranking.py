@@ -13,3 +13,19 @@ class RankingItem(BaseModel):
 class RankingListResponse(BaseModel):
     items: List[RankingItem]
     total: int
+    version: int = 0  # Leaderboard version, matches 'ranking_update' patches
+
+class RankingAroundResponse(BaseModel):
+    items: List[RankingItem]
+    rank: int  # 0 if the user has no record on this board
+    total: int
+    percentile: float  # Share of ranked players (%) slower than the user
+
+class HistogramBucket(BaseModel):
+    fromMs: int
+    count: int
+
+class RankingHistogramResponse(BaseModel):
+    bucketMs: int
+    total: int
+    buckets: List[HistogramBucket]
@@ -0,0 +1,174 @@
+"""
+Synthetic data generator for load testing.
+
+Deterministic for a given --seed and --now: played_at is spread over the --days
+before --now, which defaults to a fixed date. Users, records and best records are
+bulk-inserted in executemany batches (one transaction per batch) and the leaderboard
+is written to Redis with one pipeline per batch: the all-time board, plus the daily /
+weekly boards of the windows containing --now (pass the current time for the live
+period rankings to have data; windows that already expired are skipped). The memory
+leaderboard rebuilds only the all-time board from the database.
+
+Example:
+    python app/scripts/generate_load_data.py --users 1000000 --records-mean 5 --seed 42
+    python app/scripts/generate_load_data.py --users 1000 --now 2024-06-01T12:00:00+00:00
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import sys
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import insert
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+from app.models.game import GameRecord, UserBestRecord
+from app.core.redis import redis_client
+from app.core.leaderboard import (
+    RANK_KEY, META_KEY, VERSION_KEY, HISTOGRAM_KEY, PERIODS, build_meta, get_board, histogram_bucket
+)
+
+DEFAULT_NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def records_per_user(rng: random.Random, mean: float) -> int:
+    """Geometric distribution (>= 1) with the given mean: most players try a few times, some grind"""
+    if mean <= 1:
+        return 1
+    p = 1 / mean
+    return 1 + int(math.log(1 - rng.random()) / math.log(1 - p))
+
+def parse_now(value: str) -> datetime:
+    """ISO datetime for --now (naive values are taken as UTC)"""
+    now = datetime.fromisoformat(value)
+    return now if now.tzinfo else now.replace(tzinfo=timezone.utc)
+
+def clear_time(rng: random.Random, skill_ms: float, spread_ms: float, min_ms: int) -> int:
+    return max(min_ms, int(rng.gauss(skill_ms, spread_ms)))
+
+async def generate(args):
+    rng = random.Random(args.seed)
+    now = args.now
+    started = time.perf_counter()
+    # Daily / weekly boards of the windows containing --now, unless already expired
+    period_boards = {}
+    if not args.skip_redis:
+        period_boards = {period: get_board(period, now) for period in PERIODS if period != "all"}
+        period_boards = {period: board for period, board in period_boards.items() if board.expire_at > time.time()}
+    week_ago = now - timedelta(weeks=1)  # No window reaches further back
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    total_users = 0
+    total_records = 0
+    async with SessionLocal() as db:
+        for batch_start in range(0, args.users, args.batch_size):
+            batch_size = min(args.batch_size, args.users - batch_start)
+            users = [
+                {"name": f"{args.name_prefix}{batch_start + i + 1}", "phone": f"{args.phone_prefix}{batch_start + i + 1:08d}"}
+                for i in range(batch_size)
+            ]
+            result = await db.execute(insert(User).returning(User.id, sort_by_parameter_order=True), users)
+            user_ids = result.scalars().all()
+
+            records = []
+            best_records = []
+            period_best = {period: {} for period in period_boards}  # period -> {user_id: (ms, played_at)}
+            for user_id in user_ids:
+                # Each player has a skill level; their attempts scatter around it
+                skill = rng.gauss(args.clear_time_mean_ms, args.clear_time_sd_ms)
+                best = None
+                attempts = records_per_user(rng, args.records_mean)
+                for _ in range(attempts):
+                    ms = clear_time(rng, skill, args.clear_time_sd_ms * 0.3, args.min_clear_time_ms)
+                    played_at = now - timedelta(seconds=rng.uniform(0, args.days * 86400))
+                    records.append({"user_id": user_id, "clear_time_ms": ms, "played_at": played_at})
+                    if best is None or (ms, played_at) < best:
+                        best = (ms, played_at)
+                    if played_at <= week_ago:
+                        continue
+                    for period, board in period_boards.items():
+                        if get_board(period, played_at) == board:
+                            current = period_best[period].get(user_id)
+                            if current is None or (ms, played_at) < current:
+                                period_best[period][user_id] = (ms, played_at)
+                best_records.append({
+                    "user_id": user_id,
+                    "best_time_ms": best[0],
+                    "played_at": best[1],
+                    "attempts": attempts
+                })
+
+            await db.execute(insert(GameRecord), records)
+            await db.execute(insert(UserBestRecord), best_records)
+            await db.commit()
+
+            if not args.skip_redis:
+                names = {u_id: user["name"] for u_id, user in zip(user_ids, users)}
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.zadd(RANK_KEY, {str(row["user_id"]): row["best_time_ms"] for row in best_records})
+                    pipe.hset(META_KEY, mapping={
+                        str(row["user_id"]): build_meta(names[row["user_id"]], row["played_at"])
+                        for row in best_records
+                    })
+                    # New users only: their buckets can simply be incremented
+                    for bucket, count in Counter(histogram_bucket(row["best_time_ms"]) for row in best_records).items():
+                        pipe.hincrby(HISTOGRAM_KEY, bucket, count)
+                    for period, board in period_boards.items():
+                        best_in_window = period_best[period]
+                        if not best_in_window:
+                            continue
+                        pipe.zadd(board.rank_key, {str(u_id): ms for u_id, (ms, _) in best_in_window.items()})
+                        pipe.hset(board.meta_key, mapping={
+                            str(u_id): build_meta(names[u_id], played_at) for u_id, (_, played_at) in best_in_window.items()
+                        })
+                        for bucket, count in Counter(histogram_bucket(ms) for ms, _ in best_in_window.values()).items():
+                            pipe.hincrby(board.histogram_key, bucket, count)
+                    await pipe.execute()
+
+            total_users += len(user_ids)
+            total_records += len(records)
+            print(f"  {total_users}/{args.users} users, {total_records} records")
+
+    if not args.skip_redis:
+        await redis_client.incr(VERSION_KEY)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for board in period_boards.values():
+                pipe.incr(board.version_key)
+                for key in board.keys:
+                    pipe.expireat(key, board.expire_at)
+            await pipe.execute()
+    await redis_client.aclose()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Generated {total_users} users and {total_records} records in {elapsed:.2f}s "
+        f"({total_records / elapsed if elapsed else 0:.0f} records/s)."
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic users and game records for load testing")
+    parser.add_argument("--users", type=int, default=1000, help="Number of users to create")
+    parser.add_argument("--records-mean", type=float, default=5.0, help="Mean records per user (geometric distribution)")
+    parser.add_argument("--clear-time-mean-ms", type=float, default=45000, help="Mean player skill (clear time in ms)")
+    parser.add_argument("--clear-time-sd-ms", type=float, default=10000, help="Spread of player skill in ms")
+    parser.add_argument("--min-clear-time-ms", type=int, default=2000, help="Lower bound for clear times (matches the API check)")
+    parser.add_argument("--days", type=float, default=30, help="Spread played_at over the N days before --now")
+    parser.add_argument("--now", type=parse_now, default=DEFAULT_NOW,
+                        help=f"Reference time for played_at, ISO format (default: {DEFAULT_NOW.isoformat()})")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Users per insert batch / transaction")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed -> same dataset)")
+    parser.add_argument("--name-prefix", default="플레이어", help="User name prefix")
+    parser.add_argument("--phone-prefix", default="099", help="Phone prefix (phones must not collide with real users)")
+    parser.add_argument("--skip-redis", action="store_true", help="Only write to the database (rebuild later with migrate_redis.py)")
+    asyncio.run(generate(parser.parse_args()))
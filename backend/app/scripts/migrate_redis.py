@@ -1,41 +1,111 @@
+import argparse
 import asyncio
 import sys
 import os
+import time
+import uuid
+from collections import Counter
 
 # Add backend directory to path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from sqlalchemy import func
+from sqlalchemy import exists, func, insert
 from sqlalchemy.future import select
-from app.db.session import async_session_maker
-from app.models.game import GameRecord
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.game import GameRecord, UserBestRecord
 from app.core.redis import redis_client
+from app.core.leaderboard import RANK_KEY, META_KEY, VERSION_KEY, HISTOGRAM_KEY, build_meta, histogram_bucket
 
-async def migrate_data():
+async def backfill_best_records(db):
+    """
+    Add the missing user_best_records rows from game_records, for players whose
+    records predate the table. Users that already have a row (e.g. from a
+    submission after the deploy) are left alone, so reruns are no-ops.
+    """
+    best = (
+        select(
+            GameRecord.user_id,
+            func.min(GameRecord.clear_time_ms).label("best_time"),
+            func.count().label("attempts")
+        )
+        .where(~exists().where(UserBestRecord.user_id == GameRecord.user_id))
+        .group_by(GameRecord.user_id)
+        .subquery()
+    )
+    # Earliest date the best time was reached
+    best_date = (
+        select(func.min(GameRecord.played_at))
+        .where(GameRecord.user_id == best.c.user_id, GameRecord.clear_time_ms == best.c.best_time)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        insert(UserBestRecord).from_select(
+            ["user_id", "best_time_ms", "played_at", "attempts"],
+            select(best.c.user_id, best.c.best_time, best_date, best.c.attempts)
+        )
+    )
+    await db.commit()
+    if result.rowcount:
+        print(f"Backfilled {result.rowcount} user_best_records rows from game_records.")
+
+async def swap_keys(tmp_keys: dict, count: int):
+    """Atomically replace the live leaderboard keys with the rebuilt ones ({live key: temp key})"""
+    async with redis_client.pipeline(transaction=True) as pipe:
+        if count:
+            for live_key, tmp_key in tmp_keys.items():
+                pipe.rename(tmp_key, live_key)
+        else:
+            pipe.delete(*tmp_keys)
+        # Readers (ETags, broadcast patches) must see the leaderboard changed
+        pipe.incr(VERSION_KEY)
+        await pipe.execute()
+
+async def migrate_data(chunk_size: int):
     print("Starting migration to Redis...")
-    async with async_session_maker() as db:
-        # Get best record for each user
-        subquery = (
-            select(
-                GameRecord.user_id,
-                func.min(GameRecord.clear_time_ms).label("best_time")
+    started = time.perf_counter()
+
+    # Build into temporary keys so readers keep seeing the old leaderboard until the swap
+    suffix = uuid.uuid4().hex
+    tmp_keys = {key: f"{key}:rebuild:{suffix}" for key in (RANK_KEY, META_KEY, HISTOGRAM_KEY)}
+    histogram = Counter()
+
+    count = 0
+    try:
+        async with SessionLocal() as db:
+            await backfill_best_records(db)
+
+            query = (
+                select(UserBestRecord.user_id, UserBestRecord.best_time_ms, UserBestRecord.played_at, User.name)
+                .join(User, User.id == UserBestRecord.user_id)
+                .execution_options(yield_per=chunk_size)
             )
-            .group_by(GameRecord.user_id)
-            .subquery()
-        )
-        
-        query = select(subquery.c.user_id, subquery.c.best_time)
-        result = await db.execute(query)
-        rows = result.all()
-        
-        count = 0
-        for row in rows:
-            # ZADD game_ranks <score> <member>
-            # Score is clear_time (lower is better), Member is user_id
-            await redis_client.zadd("game_ranks", {str(row.user_id): row.best_time})
-            count += 1
-            
-        print(f"Migrated {count} user records to Redis 'game_ranks'.")
+            result = await db.stream(query)
+
+            # One pipelined ZADD + HSET per chunk
+            async for rows in result.partitions(chunk_size):
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    # Score is clear_time (lower is better), Member is user_id
+                    pipe.zadd(tmp_keys[RANK_KEY], {str(row.user_id): row.best_time_ms for row in rows})
+                    pipe.hset(tmp_keys[META_KEY], mapping={str(row.user_id): build_meta(row.name, row.played_at) for row in rows})
+                    await pipe.execute()
+                histogram.update(histogram_bucket(row.best_time_ms) for row in rows)
+                count += len(rows)
+
+        if histogram:
+            await redis_client.hset(tmp_keys[HISTOGRAM_KEY], mapping=histogram)
+        await swap_keys(tmp_keys, count)
+    except BaseException:
+        await redis_client.delete(*tmp_keys.values())
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+
+    print(f"Migrated {count} user records to Redis '{RANK_KEY}' in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} rows/s).")
+    await redis_client.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(migrate_data())
+    parser = argparse.ArgumentParser(description="Rebuild the Redis leaderboard from user_best_records")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per streamed chunk / pipelined batch")
+    args = parser.parse_args()
+    asyncio.run(migrate_data(args.chunk_size))
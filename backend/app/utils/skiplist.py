@@ -0,0 +1,127 @@
+import random
+from typing import Any, Iterator, List, Optional
+
+MAX_LEVEL = 32
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        # width[i]: positions skipped when following next[i]
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    """
+    Sorted collection of unique, comparable keys with O(log n) expected
+    insert, remove, rank (0-based index of a key) and access by index.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._head = _Node(None, MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.range(0, self._size)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _find_predecessors(self, key: Any):
+        """Last node before `key` on every level, and its position (head = 0)"""
+        update: List[_Node] = [self._head] * MAX_LEVEL
+        positions = [0] * MAX_LEVEL
+        node, position = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+            update[i], positions[i] = node, position
+        return update, positions
+
+    def insert(self, key: Any):
+        update, positions = self._find_predecessors(key)
+        successor = update[0].next[0]
+        if successor is not None and successor.key == key:
+            raise KeyError(f"Duplicate key: {key!r}")
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                # Empty levels span from the head to the end of the list
+                self._head.next[i] = None
+                self._head.width[i] = self._size + 1
+            self._level = level
+
+        node = _Node(key, level)
+        position = positions[0] + 1
+        for i in range(level):
+            prev = update[i]
+            node.next[i] = prev.next[i]
+            node.width[i] = prev.width[i] - (position - positions[i]) + 1
+            prev.next[i] = node
+            prev.width[i] = position - positions[i]
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, key: Any):
+        update, _ = self._find_predecessors(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for i in range(self._level):
+            if update[i].next[i] is node:
+                update[i].width[i] += node.width[i] - 1
+                update[i].next[i] = node.next[i]
+            else:
+                update[i].width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+
+    def rank(self, key: Any) -> Optional[int]:
+        """0-based index of `key`, or None if absent"""
+        update, positions = self._find_predecessors(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return None
+        return positions[0]
+
+    def _node_at(self, index: int) -> Optional[_Node]:
+        target = index + 1
+        node, position = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and position + node.width[i] <= target:
+                position += node.width[i]
+                node = node.next[i]
+        return node if position == target else None
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("skiplist index out of range")
+        return self._node_at(index).key
+
+    def range(self, start: int, stop: int) -> Iterator[Any]:
+        """Keys at indexes [start, stop), like a list slice with non-negative bounds"""
+        start, stop = max(start, 0), min(stop, self._size)
+        if start >= stop:
+            return
+        node = self._node_at(start)
+        for _ in range(stop - start):
+            yield node.key
+            node = node.next[0]
@@ -0,0 +1,228 @@
+"""
+Offline benchmark suite for the HTTP hot paths.
+
+Runs the FastAPI app in-process (httpx ASGI transport) against a temporary SQLite
+database and an in-memory Redis stand-in (fakeredis), seeded with
+app/scripts/generate_load_data.py. For each endpoint it records latency
+percentiles, SQL queries and Redis round trips per request, and writes the results as JSON so runs
+can be compared between commits.
+
+Usage (from backend/):
+    pip install -r requirements-bench.txt
+    python benchmarks/run_benchmarks.py --users 5000 --iterations 300
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old commit>.json
+    python benchmarks/run_benchmarks.py --leaderboard memory --compare benchmarks/results/<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+# Configure the app for an offline run before anything imports settings
+WORK_DIR = tempfile.mkdtemp(prefix="sos-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{WORK_DIR}/data/bench.db")
+os.environ.setdefault("SOCKETIO_REDIS_MANAGER", "false")
+os.environ.setdefault("S3_LOCAL_DIR", os.path.join(WORK_DIR, "puzzles"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LEADERBOARD_SNAPSHOT_PATH", os.path.join(WORK_DIR, "data", "leaderboard.json"))
+# The leaderboard engine is chosen at import time
+if "--leaderboard" in sys.argv[:-1]:
+    os.environ["LEADERBOARD_BACKEND"] = sys.argv[sys.argv.index("--leaderboard") + 1]
+
+import fakeredis
+import httpx
+
+# Swap the Redis client before the modules that import it are loaded
+import app.core.redis as core_redis
+core_redis.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+from app.main import app
+from app.core.config import settings
+from app.db.session import engine, read_engine
+from app.core.profiling import profile_block, install_db_hooks, install_redis_hooks
+from app.scripts.generate_load_data import DEFAULT_NOW, generate
+
+API = "/api/v1"
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(latencies_ms, queries, redis_calls):
+    return {
+        "requests": len(latencies_ms),
+        "mean_ms": round(statistics.fmean(latencies_ms), 3),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p90_ms": round(percentile(latencies_ms, 90), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "max_ms": round(max(latencies_ms), 3),
+        "queries_per_request": round(statistics.fmean(queries), 2),
+        "max_queries_per_request": max(queries),
+        "redis_calls_per_request": round(statistics.fmean(redis_calls), 2),
+    }
+
+
+async def measure(name, make_request, iterations, warmup):
+    for _ in range(warmup):
+        await make_request()
+
+    latencies, queries, redis_calls = [], [], []
+    for _ in range(iterations):
+        with profile_block() as profile:
+            started = time.perf_counter()
+            response = await make_request()
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(profile.db_queries)
+        redis_calls.append(profile.redis_calls)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text}")
+
+    result = summarize(latencies, queries, redis_calls)
+    print(
+        f"{name:<22} p50 {result['p50_ms']:>8.2f}ms  p90 {result['p90_ms']:>8.2f}ms  "
+        f"p99 {result['p99_ms']:>8.2f}ms  queries/req {result['queries_per_request']:>5.2f}  "
+        f"redis/req {result['redis_calls_per_request']:>5.2f}"
+    )
+    return result
+
+
+async def run(args):
+    os.makedirs(os.path.join(WORK_DIR, "data"), exist_ok=True)
+    os.makedirs(os.environ["S3_LOCAL_DIR"], exist_ok=True)
+    open(os.path.join(os.environ["S3_LOCAL_DIR"], "puzzle.png"), "wb").close()
+
+    rng = random.Random(args.seed)
+    install_db_hooks(engine, read_engine)
+    install_redis_hooks(core_redis.redis_client)
+
+    # Seed before startup so the memory leaderboard loads the seeded best records
+    print(f"Seeding {args.users} users...")
+    await generate(argparse.Namespace(
+        users=args.users, records_mean=args.records_mean, clear_time_mean_ms=45000, clear_time_sd_ms=10000,
+        min_clear_time_ms=2000, days=30, now=DEFAULT_NOW, batch_size=5000, seed=args.seed,
+        name_prefix="플레이어", phone_prefix="099", skip_redis=settings.LEADERBOARD_BACKEND != "redis"
+    ))
+
+    async with app.router.lifespan_context(app):
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Bench users sign in with fresh phones so /auth/signin covers the create path too
+            phone_seq = iter(range(10 ** 7))
+
+            async def signin(phone=None):
+                phone = phone or f"098{next(phone_seq):08d}"
+                return await client.post(f"{API}/auth/signin", json={"name": "벤치", "phone": phone})
+
+            tokens = []
+            for _ in range(args.bench_users):
+                tokens.append((await signin()).json()["accessToken"])
+            headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+            cases = {
+                "POST /games/record": lambda: client.post(
+                    f"{API}/games/record",
+                    json={"clearTimeMs": rng.randint(20000, 90000)},
+                    headers=rng.choice(headers)
+                ),
+                "GET /ranks": lambda: client.get(
+                    f"{API}/ranks",
+                    params={"skip": rng.choice([0, 0, 0, rng.randrange(0, args.users)]), "limit": 10}
+                ),
+                "GET /ranks/my": lambda: client.get(f"{API}/ranks/my", headers=rng.choice(headers)),
+                "GET /games/history": lambda: client.get(
+                    f"{API}/games/history",
+                    params={"limit": 10, "sort_by": rng.choice(["date", "record"])},
+                    headers=rng.choice(headers)
+                ),
+                "POST /auth/signin": lambda: signin(),
+            }
+
+            results = {}
+            for name, make_request in cases.items():
+                if args.only and name not in args.only:
+                    continue
+                results[name] = await measure(name, make_request, args.iterations, args.warmup)
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared to {baseline['meta']['commit']} ({baseline_path}):")
+    for name, result in results.items():
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        delta = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0
+        print(
+            f"{name:<22} p50 {old['p50_ms']:>8.2f} -> {result['p50_ms']:>8.2f}ms ({delta:+.1f}%)  "
+            f"queries/req {old['queries_per_request']:.2f} -> {result['queries_per_request']:.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP hot paths offline")
+    parser.add_argument("--users", type=int, default=2000, help="Seeded users")
+    parser.add_argument("--records-mean", type=float, default=5.0, help="Mean seeded records per user")
+    parser.add_argument("--bench-users", type=int, default=20, help="Signed-in users issuing authenticated requests")
+    parser.add_argument("--iterations", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Endpoint names to run, e.g. 'GET /ranks'")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    parser.add_argument("--leaderboard", choices=["redis", "memory"], default=settings.LEADERBOARD_BACKEND,
+                        help="Leaderboard engine (LEADERBOARD_BACKEND)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    commit = git_commit()
+    output = args.output or os.path.join(BACKEND_DIR, "benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "users": args.users,
+                "records_mean": args.records_mean,
+                "iterations": args.iterations,
+                "seed": args.seed,
+                "leaderboard": settings.LEADERBOARD_BACKEND,
+            },
+            "results": results,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,24 @@
+import os
+import tempfile
 import pytest
 import requests
 import random
 import string
 
+# In-process tests import the app directly: keep them offline and off the real database
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='sos-test-')}/test.db")
+os.environ.setdefault("SOCKETIO_REDIS_MANAGER", "false")
+
+# ...and on an in-memory Redis when fakeredis is installed (requirements-bench.txt).
+# Swapped before any test module imports code that binds the client.
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+else:
+    import app.core.redis as core_redis
+    core_redis.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
 BASE_URL = "http://127.0.0.1:8000/api/v1"
 
 @pytest.fixture
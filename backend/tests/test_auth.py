@@ -8,3 +8,21 @@ def test_signin_success(api_url, random_user):
     assert data["user"]["name"] == random_user["name"]
     # Phone is not returned in UserResponse for privacy/schema reasons
     assert "id" in data["user"]
+
+def test_signin_returning_user(api_url, random_user):
+    first = requests.post(f"{api_url}/auth/signin", json=random_user).json()
+    resp = requests.post(f"{api_url}/auth/signin", json=random_user)
+    assert resp.status_code == 200
+    assert resp.json()["user"]["id"] == first["user"]["id"]
+
+    resp = requests.post(f"{api_url}/auth/signin", json={**random_user, "name": random_user["name"] + "x"})
+    assert resp.status_code == 400
+
+def test_signin_concurrent_duplicates(api_url, random_user):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: requests.post(f"{api_url}/auth/signin", json=random_user), range(8)))
+
+    assert [resp.status_code for resp in responses] == [200] * 8
+    assert len({resp.json()["user"]["id"] for resp in responses}) == 1
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api import deps
+from app.core import security
+from app.db.base import Base
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+# Runs in-process: the per-process token / user caches behind get_current_user
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    monkeypatch.setattr(deps, "_token_cache", TTLCache(max_size=100, ttl=60))
+    monkeypatch.setattr(deps, "_user_cache", TTLCache(max_size=100, ttl=0.2))
+
+    decoded = []
+    decode = security.decode_access_token
+
+    def counting_decode(token):
+        decoded.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(security, "decode_access_token", counting_decode)
+    return decoded
+
+
+def test_token_cache_hit(caches):
+    token = security.create_access_token(subject=7)
+
+    async def run():
+        return [await deps.get_current_user_id(token) for _ in range(3)]
+
+    assert asyncio.run(run()) == [7, 7, 7]
+    assert len(caches) == 1
+
+
+def test_token_cache_never_outlives_the_token(caches):
+    token = security.create_access_token(subject=7, expires_delta=timedelta(seconds=1))
+    assert asyncio.run(deps.get_current_user_id(token)) == 7
+
+    # The cache TTL is 60 s, but the entry expires with the token
+    time.sleep(2.1)  # exp has whole-second precision
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(deps.get_current_user_id(token))
+    assert error.value.status_code == 401
+    assert len(caches) == 2
+
+
+def test_user_cache_hit_then_expiry(caches, tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/users.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with session_factory() as db:
+            db.add(User(id=7, name="Cached", phone="010-0000-0007"))
+            await db.commit()
+            user = await deps.get_current_user(7, db)
+            assert user.name == "Cached"
+
+            # Served from the cache without reading the (now deleted) row
+            await db.execute(delete(User).where(User.id == 7))
+            await db.commit()
+            assert await deps.get_current_user(7, db) is user
+
+            # Expired: looked up again
+            await asyncio.sleep(0.3)
+            with pytest.raises(HTTPException):
+                await deps.get_current_user(7, db)
+        await engine.dispose()
+
+    asyncio.run(run())
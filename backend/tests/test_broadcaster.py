@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.core import broadcaster as broadcaster_module
+from app.core.broadcaster import RankingBroadcaster
+from app.core.leaderboard.memory_backend import MemoryLeaderboard
+
+# Runs in-process against the memory leaderboard, with emits captured instead of sent
+
+PLAYED_AT = datetime(2026, 1, 5, 3, 0, tzinfo=timezone.utc)
+
+
+def make_broadcaster(tmp_path, monkeypatch):
+    """Broadcaster for one live page; returns it with its board, the page-0 subscription switch and the emitted payloads"""
+    board = MemoryLeaderboard(snapshot_path=str(tmp_path / "leaderboard.json"), snapshot_interval=0)
+    subscribed = {0: True}
+    emitted = []
+
+    async def emit(event, data, **kwargs):
+        emitted.append(data)
+
+    monkeypatch.setattr(broadcaster_module, "leaderboard", board)
+    monkeypatch.setattr(broadcaster_module, "page_has_subscribers", lambda page: subscribed[page])
+    monkeypatch.setattr(broadcaster_module.sio, "emit", emit)
+    return RankingBroadcaster(interval=0, depth=10, pages=1), board, subscribed, emitted
+
+async def submit(broadcaster, board, user_id, ms) -> int:
+    result = await board.record(user_id, f"Player{user_id}", ms, PLAYED_AT, 10)
+    broadcaster.mark_dirty(result.version, result.top, result.rank, result.previous_rank)
+    await broadcaster.broadcast()
+    return result.version
+
+def test_unwatched_page_patch_has_no_base(tmp_path, monkeypatch):
+    broadcaster, board, subscribed, emitted = make_broadcaster(tmp_path, monkeypatch)
+
+    async def run():
+        await submit(broadcaster, board, 1, 50000)
+        subscribed[0] = False
+        await submit(broadcaster, board, 2, 40000)  # Skipped: the stored broadcast is now outdated
+        subscribed[0] = True
+        await submit(broadcaster, board, 3, 45000)
+
+    asyncio.run(run())
+    # Clients that followed since before the skip are behind: the patch makes them refetch
+    assert emitted[-1]["base"] is None
+    assert {row["userId"] for row in emitted[-1]["inserted"]} == {"1", "2", "3"}
+
+def test_snapshot_after_unwatched_change_is_the_next_patch_base(tmp_path, monkeypatch):
+    broadcaster, board, subscribed, emitted = make_broadcaster(tmp_path, monkeypatch)
+
+    async def run():
+        watched = await submit(broadcaster, board, 1, 50000)
+        subscribed[0] = False
+        await submit(broadcaster, board, 2, 40000)
+        snapshot = await broadcaster.snapshot()  # First socket after the skip
+        subscribed[0] = True
+        latest = await submit(broadcaster, board, 3, 45000)
+        return watched, snapshot, latest
+
+    watched, snapshot, latest = asyncio.run(run())
+    assert snapshot["version"] > watched
+    assert [row["userId"] for row in snapshot["items"]] == ["2", "1"]
+    assert [(patch["base"], patch["version"]) for patch in emitted] == [(None, watched), (snapshot["version"], latest)]
@@ -56,3 +56,33 @@ def test_game_record_ignore_worse_score(api_url, auth_header):
     resp = requests.get(rank_url, headers=auth_header)
     data = resp.json()
     assert data["record"] == "30.00"
+
+def test_game_history_rank_and_cursor(api_url, auth_header):
+    record_url = f"{api_url}/games/record"
+    for clear_time in [42000, 38000, 40000]:
+        requests.post(record_url, json={"clearTimeMs": clear_time}, headers=auth_header)
+
+    history_url = f"{api_url}/games/history"
+    resp = requests.get(history_url, params={"sort_by": "record", "order": "asc", "limit": 10}, headers=auth_header)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 3
+    assert [item["rank"] for item in data["items"]] == [1, 2, 3]
+    assert [item["record"] for item in data["items"]] == ["38.00", "40.00", "42.00"]
+
+    # Keyset pagination returns the same rows one page at a time
+    records, ranks = [], []
+    params = {"sort_by": "record", "order": "asc", "limit": 2}
+    while True:
+        resp = requests.get(history_url, params=params, headers=auth_header)
+        assert resp.status_code == 200
+        page = resp.json()
+        records += [item["record"] for item in page["items"]]
+        ranks += [item["rank"] for item in page["items"]]
+        # Only offset pages count the total
+        assert page["total"] == (None if "cursor" in params else 3)
+        if not page["nextCursor"]:
+            break
+        params["cursor"] = page["nextCursor"]
+    assert records == ["38.00", "40.00", "42.00"]
+    assert ranks == [1, 2, 3]
@@ -0,0 +1,82 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1.endpoints.games import get_my_game_history
+from app.db.base import Base
+from app.models.game import GameRecord
+from app.models.user import User
+
+# Runs in-process against a throwaway SQLite database (no server needed)
+
+PLAYED_AT = datetime(2026, 1, 5, 3, 0, tzinfo=timezone.utc)
+
+
+async def seed(tmp_path, clear_times):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/history.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": 1, "name": "Alpha", "phone": "010-0000-0001"},
+                                          {"id": 2, "name": "Bravo", "phone": "010-0000-0002"}])
+        await conn.execute(insert(GameRecord), [
+            {"user_id": 1, "clear_time_ms": ms, "played_at": PLAYED_AT + timedelta(minutes=i)}
+            for i, ms in enumerate(clear_times)
+        ] + [{"user_id": 2, "clear_time_ms": 1000, "played_at": PLAYED_AT}])
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+async def history(session_factory, **params):
+    async with session_factory() as db:
+        return await get_my_game_history(user_id=1, db=db, **{"skip": 0, "cursor": None, **params})
+
+def expected_rank(clear_times, record: str) -> int:
+    ms = round(float(record) * 1000)
+    return 1 + sum(1 for other in clear_times if other < ms)
+
+def test_record_sorted_ranks_on_offset_and_cursor_pages(tmp_path):
+    rng = random.Random(7)
+    # Many ties, so pages start and end inside tie groups
+    clear_times = [rng.choice([30000, 31000, 32000, 33000]) + rng.choice([0, 0, 500]) for _ in range(37)]
+
+    async def run():
+        engine, session_factory = await seed(tmp_path, clear_times)
+        pages = {}
+        for order in ("asc", "desc"):
+            for limit in (1, 4, 5, 50):
+                walked, cursor = [], None
+                while True:
+                    page = await history(session_factory, sort_by="record", order=order, limit=limit, cursor=cursor)
+                    walked += page["items"]
+                    cursor = page["nextCursor"]
+                    if not cursor:
+                        break
+                offset = []
+                for skip in range(0, len(clear_times), limit):
+                    offset += (await history(session_factory, sort_by="record", order=order, limit=limit, skip=skip))["items"]
+                pages[order, limit] = walked, offset
+        await engine.dispose()
+        return pages
+
+    for (order, limit), (walked, offset) in asyncio.run(run()).items():
+        assert len(walked) == len(clear_times)
+        assert walked == offset
+        assert [item["rank"] for item in walked] == [expected_rank(clear_times, item["record"]) for item in walked]
+        times = [item["record"] for item in walked]
+        assert times == sorted(times, key=float, reverse=order == "desc")
+
+def test_history_empty_and_invalid_pages(tmp_path):
+    async def run():
+        engine, session_factory = await seed(tmp_path, [30000])
+        with pytest.raises(HTTPException) as rejected:
+            await history(session_factory, sort_by="record", order="asc", limit=0)
+        past_end = await history(session_factory, sort_by="record", order="asc", limit=10, skip=5)
+        await engine.dispose()
+        return rejected.value, past_end
+
+    rejected, past_end = asyncio.run(run())
+    assert rejected.status_code == 400
+    assert past_end == {"items": [], "total": 1, "nextCursor": None}
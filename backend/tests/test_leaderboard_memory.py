@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.core.leaderboard.memory_backend import MemoryLeaderboard
+
+# Runs in-process (no server or Redis needed)
+
+PLAYED_AT = datetime(2026, 1, 5, 3, 0, tzinfo=timezone.utc)
+
+
+def test_memory_leaderboard_ranks_like_a_zset(tmp_path):
+    board = MemoryLeaderboard(snapshot_path=str(tmp_path / "leaderboard.json"), snapshot_interval=0)
+
+    async def run():
+        assert await board.record(1, "Alpha", 50000, PLAYED_AT, 10) == (1, 1, 1, [("1", 50000.0)], None, [])
+        # Bravo takes first place and pushes Alpha down
+        result = await board.record(2, "Bravo", 40000, PLAYED_AT, 10, displaced_limit=5)
+        assert result.displaced == [("1", 50000.0, 2)]
+        await board.record(3, "Charlie", 45000, PLAYED_AT, 10)
+        # Slower than the best time: no change
+        result = await board.record(2, "Bravo", 48000, PLAYED_AT, 10, displaced_limit=5)
+        assert result == (0, 1, 3, [], 1, [])
+
+        items, total, version = await board.page(0, 10)
+        assert [(row["userId"], row["rank"], row["record"]) for row in items] == [
+            ("2", 1, "40.00"), ("3", 2, "45.00"), ("1", 3, "50.00")
+        ]
+        assert items[0]["name"] == "B***o"
+        assert (total, version) == (3, 3)
+
+        assert await board.member_rank(1) == (3, 50000.0)
+        assert await board.member_rank(4) is None
+
+        items, rank, total = await board.around(3, 1)
+        assert [row["rank"] for row in items] == [1, 2, 3] and (rank, total) == (2, 3)
+
+        # Improving from 3rd to 2nd displaces only Charlie; moves Alpha between histogram buckets
+        result = await board.record(1, "Alpha", 41000, PLAYED_AT, 10, displaced_limit=5)
+        assert (result.rank, result.previous_rank, result.displaced) == (2, 3, [("3", 45000.0, 3)])
+        assert await board.histogram() == [(40000, 2), (45000, 1)]
+
+    asyncio.run(run())
+
+
+def test_memory_leaderboard_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "leaderboard.json")
+    board = MemoryLeaderboard(snapshot_path=path, snapshot_interval=0)
+
+    async def save():
+        await board.record(1, "Alpha", 50000, datetime.now(timezone.utc), 10)
+        await board.record(2, "Bravo", 40000, datetime.now(timezone.utc), 10)
+        await board.store_broadcast({"version": 2, "items": []})
+        await board.save_snapshot()
+
+    asyncio.run(save())
+
+    restored = MemoryLeaderboard(snapshot_path=path, snapshot_interval=0)
+    assert restored.load_snapshot()
+
+    async def check():
+        for period in ("all", "daily", "weekly"):
+            assert await restored.page(0, 10, period) == await board.page(0, 10, period)
+        assert await restored.histogram() == await board.histogram()
+        assert await restored.load_broadcast() == {"version": 2, "items": []}
+
+    asyncio.run(check())
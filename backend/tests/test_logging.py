@@ -0,0 +1,25 @@
+import logging
+from logging.handlers import QueueHandler
+
+from app.core.logger import setup_logging, shutdown_logging
+from app.core.socket import sio
+
+# Runs in-process: Socket.IO / engine.io records must go through the root queue only
+
+
+def test_socketio_loggers_use_the_root_queue():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    setup_logging()
+    try:
+        for name in ("socketio.server", "engineio.server"):
+            socket_logger = logging.getLogger(name)
+            assert socket_logger.handlers == []
+            assert socket_logger.propagate
+        assert sio.logger is logging.getLogger("socketio.server")
+        assert sio.eio.logger is logging.getLogger("engineio.server")
+        assert [type(handler) for handler in logging.getLogger().handlers] == [QueueHandler]
+    finally:
+        shutdown_logging()
+        root.handlers[:] = handlers
+        root.setLevel(level)
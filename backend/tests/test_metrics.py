@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from app.core.metrics import Counter, Gauge, Histogram, MetricsRegistry, registry
+from app.core.middleware.logging_middleware import LoggingMiddleware
+
+# Runs in-process (no server needed)
+
+httpx = pytest.importorskip("httpx")
+
+
+def sample(name: str, labels: str = "") -> float:
+    """Current value of one series in the /metrics text (0 if not reported yet)"""
+    prefix = f"{name}{{{labels}}} " if labels else f"{name} "
+    for line in registry.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def test_registry_text_format():
+    metrics = MetricsRegistry()
+    requests = metrics.register(Counter("demo_requests_total", "Requests", ("route",)))
+    in_flight = metrics.register(Gauge("demo_in_flight", "In flight"))
+    latency = metrics.register(Histogram("demo_seconds", "Latency", buckets=(0.1, 1.0)))
+    requests.inc("/a")
+    requests.inc("/a", amount=2)
+    in_flight.inc()
+    in_flight.dec()
+    latency.observe(0.5)
+
+    assert metrics.render().splitlines() == [
+        "# HELP demo_requests_total Requests",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{route="/a"} 3',
+        "# HELP demo_in_flight In flight",
+        "# TYPE demo_in_flight gauge",
+        "demo_in_flight 0",
+        "# HELP demo_seconds Latency",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{le="0.1"} 0',
+        'demo_seconds_bucket{le="1.0"} 1',
+        'demo_seconds_bucket{le="+Inf"} 1',
+        "demo_seconds_sum 0.5",
+        "demo_seconds_count 1",
+    ]
+
+
+def test_middleware_labels_routes_and_statuses():
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/metrics-test/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/metrics-test/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="missing")
+
+    @app.get("/metrics-test/in-progress")
+    async def in_progress():
+        return {"value": sample("http_requests_in_progress", 'method="GET"')}
+
+    @app.get("/metrics-test/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    route = '/metrics-test/items/{item_id}'
+    before = {
+        "ok": sample("http_requests_total", f'method="GET",route="{route}",status="200"'),
+        "bad_request": sample("http_requests_total", f'method="GET",route="{route}",status="422"'),
+        "not_found": sample("http_requests_total", 'method="GET",route="/metrics-test/missing",status="404"'),
+        "error": sample("http_requests_total", 'method="GET",route="/metrics-test/boom",status="500"'),
+        "latency": sample("http_request_duration_seconds_count", f'method="GET",route="{route}"'),
+    }
+
+    async def run():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = [(await client.get(path)).status_code for path in (
+                "/metrics-test/items/1", "/metrics-test/items/2", "/metrics-test/items/x",
+                "/metrics-test/missing", "/metrics-test/boom"
+            )]
+            during = (await client.get("/metrics-test/in-progress")).json()["value"]
+        return statuses, during
+
+    statuses, during = asyncio.run(run())
+    assert statuses == [200, 200, 422, 404, 500]
+    assert during == 1
+    # One series per route template, not per path
+    assert sample("http_requests_total", f'method="GET",route="{route}",status="200"') == before["ok"] + 2
+    assert sample("http_requests_total", f'method="GET",route="{route}",status="422"') == before["bad_request"] + 1
+    assert sample("http_requests_total", 'method="GET",route="/metrics-test/missing",status="404"') == before["not_found"] + 1
+    # A raised exception is counted as a 500
+    assert sample("http_requests_total", 'method="GET",route="/metrics-test/boom",status="500"') == before["error"] + 1
+    assert sample("http_request_duration_seconds_count", f'method="GET",route="{route}"') == before["latency"] + 3
+    assert sample("http_requests_in_progress", 'method="GET"') == 0
+    assert "/metrics-test/items/1" not in registry.render()
+
+
+@pytest.fixture(scope="module")
+def local_app():
+    """The full app on the test SQLite database and an in-memory Redis"""
+    pytest.importorskip("fakeredis")  # Swapped in by conftest
+    from app.main import app
+    return app
+
+
+def test_metrics_endpoint(local_app):
+    app = local_app
+
+    async def run():
+        # No lifespan: neither route needs the leaderboard or the background tasks
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/health")
+            return await client.get("/metrics")
+
+    resp = asyncio.run(run())
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_requests_total counter" in resp.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in resp.text
+    assert "# TYPE socketio_connections gauge" in resp.text
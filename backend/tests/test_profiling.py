@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.profiling import profile_block, install_db_hooks, install_redis_hooks
+
+# Runs in-process (no server needed)
+
+def test_profile_counts_queries_and_repeats():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    install_db_hooks(engine)
+
+    async def run():
+        async with engine.connect() as conn:
+            with profile_block() as profile:
+                for i in range(4):
+                    await conn.execute(text("SELECT :i"), {"i": i})
+                await conn.execute(text("SELECT 1"))
+            # Outside the block nothing is counted
+            await conn.execute(text("SELECT 2"))
+        await engine.dispose()
+        return profile
+
+    profile = asyncio.run(run())
+    assert profile.db_queries == 5
+    assert profile.repeated_statements(3) == ["SELECT ?"]
+    assert 'desc="5 queries"' in profile.server_timing()
+
+
+@pytest.fixture(scope="module")
+def local_app():
+    """The full app on the test SQLite database and an in-memory Redis"""
+    pytest.importorskip("fakeredis")  # Swapped in by conftest
+    httpx = pytest.importorskip("httpx")
+
+    import app.core.redis as core_redis
+
+    from app.main import app
+    from app.db.session import engine, read_engine
+    install_db_hooks(engine, read_engine)
+    install_redis_hooks(core_redis.redis_client)
+    return app, httpx
+
+
+def test_endpoint_query_counts(local_app):
+    """Lock in SQL queries per request for the hot paths (warm auth cache)"""
+    app, httpx = local_app
+
+    async def run():
+        counts = {}
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+                signin = {"name": "Profiler", "phone": "010-0000-0001"}
+                with profile_block() as profile:
+                    resp = await client.post("/auth/signin", json=signin)
+                counts["signin_new"] = (profile.db_queries, profile.redis_calls)
+                headers = {"Authorization": f"Bearer {resp.json()['accessToken']}"}
+                await client.post("/games/record", json={"clearTimeMs": 40000}, headers=headers)
+
+                requests = {
+                    "record": lambda: client.post("/games/record", json={"clearTimeMs": 39000}, headers=headers),
+                    "ranks": lambda: client.get("/ranks"),
+                    "my_rank": lambda: client.get("/ranks/my", headers=headers),
+                    "history": lambda: client.get("/games/history", headers=headers),
+                    "signin_existing": lambda: client.post("/auth/signin", json=signin),
+                }
+                for name, make_request in requests.items():
+                    with profile_block() as profile:
+                        resp = await make_request()
+                    assert resp.status_code < 400, name
+                    counts[name] = (profile.db_queries, profile.redis_calls)
+        return counts
+
+    counts = asyncio.run(run())
+    assert counts["record"] == (2, 1)  # INSERT record + best-record upsert; one Lua call
+    assert counts["ranks"][0] == 0
+    assert counts["my_rank"][0] == 0
+    assert counts["history"] == (1, 0)
+    assert counts["signin_new"] == (2, 0)  # SELECT miss, then INSERT ... ON CONFLICT DO UPDATE RETURNING
+    assert counts["signin_existing"] == (1, 0)  # SELECT only, no write
@@ -0,0 +1,97 @@
+import asyncio
+
+from botocore.exceptions import ClientError
+
+from app.core.s3 import LocalS3Client, PuzzleCatalog
+
+# Runs in-process against the filesystem stand-in (no server or S3 needed)
+
+def make_catalog(tmp_path, ttl=300):
+    for name in ["a.png", "b.webp", "notes.txt"]:
+        (tmp_path / name).write_bytes(b"x")
+    client = LocalS3Client(str(tmp_path))
+    return PuzzleCatalog(ttl=ttl, url_expiration=300, url_refresh_margin=60, client_factory=lambda: client)
+
+def test_catalog_lists_only_images(tmp_path):
+    catalog = make_catalog(tmp_path)
+    keys = asyncio.run(catalog.get_keys())
+    assert sorted(keys) == ["a.png", "b.webp"]
+
+def test_catalog_reuses_presigned_url(tmp_path):
+    catalog = make_catalog(tmp_path)
+
+    async def run():
+        first = await catalog.get_url("a.png")
+        second = await catalog.get_url("a.png")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first and first == second
+
+def test_catalog_refreshes_in_background(tmp_path):
+    catalog = make_catalog(tmp_path, ttl=0)
+
+    async def run():
+        await catalog.get_keys()
+        (tmp_path / "c.jpg").write_bytes(b"x")
+        stale = list(await catalog.get_keys())  # Served from the old list, refresh scheduled
+        await asyncio.sleep(0.1)
+        return stale, await catalog.get_keys()
+
+    stale, fresh = asyncio.run(run())
+    assert "c.jpg" not in stale
+    assert "c.jpg" in fresh
+
+class FlakyClient(LocalS3Client):
+    """Local client whose listing fails while `failing` is set"""
+
+    failing = False
+
+    def list_objects_v2(self, Bucket: str, **kwargs) -> dict:
+        if self.failing:
+            raise ClientError({"Error": {"Code": "SlowDown", "Message": "Please reduce your request rate"}}, "ListObjectsV2")
+        return super().list_objects_v2(Bucket, **kwargs)
+
+def test_catalog_keeps_keys_when_refresh_fails(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"x")
+    client = FlakyClient(str(tmp_path))
+    catalog = PuzzleCatalog(
+        ttl=0, url_expiration=300, url_refresh_margin=60, retry_interval=0.05, client_factory=lambda: client
+    )
+
+    async def run():
+        assert await catalog.get_keys() == ["a.png"]
+        client.failing = True
+        await catalog.get_keys()  # Schedules a refresh that fails
+        await asyncio.sleep(0.01)
+        kept = list(await catalog.get_keys())
+
+        client.failing = False
+        (tmp_path / "b.png").write_bytes(b"x")
+        await asyncio.sleep(0.1)  # Past the retry delay
+        await catalog.get_keys()
+        await asyncio.sleep(0.1)
+        return kept, await catalog.get_keys()
+
+    kept, retried = asyncio.run(run())
+    assert kept == ["a.png"]
+    assert sorted(retried) == ["a.png", "b.png"]
+
+def test_catalog_retries_a_failed_first_load(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"x")
+    client = FlakyClient(str(tmp_path))
+    client.failing = True
+    catalog = PuzzleCatalog(
+        ttl=300, url_expiration=300, url_refresh_margin=60, retry_interval=0.05, client_factory=lambda: client
+    )
+
+    async def run():
+        empty = await catalog.get_keys()
+        client.failing = False
+        before_retry = list(await catalog.get_keys())  # Not retried before the delay
+        await asyncio.sleep(0.1)
+        return empty, before_retry, await catalog.get_keys()
+
+    empty, before_retry, loaded = asyncio.run(run())
+    assert empty == [] and before_retry == []
+    assert loaded == ["a.png"]
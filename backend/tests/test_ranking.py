@@ -1,4 +1,7 @@
 import requests
+import random
+
+from app.core.leaderboard import get_board
 
 def create_user_with_score(api_url, name, phone, score_ms):
     resp = requests.post(f"{api_url}/auth/signin", json={"name": name, "phone": phone})
@@ -28,7 +31,7 @@ def test_ranking_order_and_masking(api_url):
     
     resp = requests.get(f"{api_url}/ranks?limit=50") # fetch enough to find them
     assert resp.status_code == 200
-    ranks = resp.json()
+    ranks = resp.json()["items"]
     
     # Find our users
     # Records: 40.00, 45.00, 50.00
@@ -58,3 +61,64 @@ def test_ranking_order_and_masking(api_url):
     # Rank B < Rank C < Rank A
     assert entry_b["rank"] < entry_c["rank"] < entry_a["rank"], \
         f"Ranking order incorrect: {entry_b['rank']} < {entry_c['rank']} < {entry_a['rank']}"
+
+def test_ranking_conditional_get(api_url):
+    resp = requests.get(f"{api_url}/ranks?limit=5")
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert etag == f'"{get_board("all").rank_key}-{resp.json()["version"]}-0-5"'
+
+    resp = requests.get(f"{api_url}/ranks?limit=5", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+
+    # A new best time bumps the version and invalidates the tag
+    create_user_with_score(api_url, "Etag", f"010-7777-{random.randint(1000, 9999)}", 2000)
+    resp = requests.get(f"{api_url}/ranks?limit=5", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+    # Daily / weekly versions restart every window: the tag names the window
+    resp = requests.get(f"{api_url}/ranks?limit=5&period=daily")
+    assert resp.headers["ETag"].startswith(f'"{get_board("daily").rank_key}-')
+
+
+def test_period_rankings(api_url):
+    suffix = str(random.randint(1000, 9999))
+    token = create_user_with_score(api_url, f"Daily{suffix}", f"010-8888-{suffix}", 2500)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for period in ("daily", "weekly"):
+        resp = requests.get(f"{api_url}/ranks?period={period}&limit=100")
+        assert resp.status_code == 200
+        assert any(r["userId"] for r in resp.json()["items"])
+
+        resp = requests.get(f"{api_url}/ranks/my?period={period}", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["rank"] >= 1
+        assert resp.json()["record"] == "2.50"
+
+    resp = requests.get(f"{api_url}/ranks?period=monthly")
+    assert resp.status_code == 400
+
+def test_ranks_around_me_and_histogram(api_url):
+    suffix = str(random.randint(1000, 9999))
+    token = create_user_with_score(api_url, f"Around{suffix}", f"010-9999-{suffix}", 63000)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    resp = requests.get(f"{api_url}/ranks/around?k=2", headers=headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["rank"] >= 1
+    assert 0 <= data["percentile"] < 100
+    ranks = [r["rank"] for r in data["items"]]
+    assert data["rank"] in ranks
+    assert ranks == list(range(ranks[0], ranks[0] + len(ranks)))
+    assert len(ranks) <= 5
+
+    resp = requests.get(f"{api_url}/ranks/histogram")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == sum(b["count"] for b in data["buckets"])
+    bucket = 63000 // data["bucketMs"] * data["bucketMs"]
+    assert any(b["fromMs"] == bucket and b["count"] >= 1 for b in data["buckets"])
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.record_queue import RecordWriteQueue
+from app.models.game import GameRecord, UserBestRecord
+from app.models.user import User  # noqa: F401 (registers the users table)
+
+# Runs in-process against a throwaway SQLite database (no server needed)
+
+PLAYED_AT = datetime(2026, 1, 5, 3, 0, tzinfo=timezone.utc)
+
+
+async def make_queue(tmp_path, max_batch=100, max_wait_ms=5):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/records.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    queue = RecordWriteQueue(max_batch, max_wait_ms, session_factory=async_sessionmaker(engine, expire_on_commit=False))
+
+    # Record the size of every flushed batch
+    queue.batches = []
+    flush = queue._flush
+
+    async def tracked_flush(batch):
+        queue.batches.append(len(batch))
+        await flush(batch)
+
+    queue._flush = tracked_flush
+    return queue, engine
+
+
+def test_batches_by_size_and_resolves_each_record_id(tmp_path):
+    async def run():
+        queue, engine = await make_queue(tmp_path, max_batch=3, max_wait_ms=50)
+        queue.start()
+        ids = await asyncio.gather(*(queue.submit(user_id, 30000 + user_id, PLAYED_AT) for user_id in range(1, 8)))
+        await queue.stop()
+
+        assert queue.batches == [3, 3, 1]
+        async with engine.connect() as conn:
+            rows = dict((await conn.execute(select(GameRecord.id, GameRecord.user_id))).all())
+        # Every request got the id of its own row
+        assert [rows[record_id] for record_id in ids] == list(range(1, 8))
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_batches_by_deadline(tmp_path):
+    async def run():
+        queue, engine = await make_queue(tmp_path, max_batch=100, max_wait_ms=20)
+        queue.start()
+        await asyncio.wait_for(
+            asyncio.gather(queue.submit(1, 40000, PLAYED_AT), queue.submit(1, 35000, PLAYED_AT)), timeout=2
+        )
+        await queue.submit(2, 50000, PLAYED_AT)
+        await queue.stop()
+
+        assert queue.batches == [2, 1]
+        async with engine.connect() as conn:
+            best = (await conn.execute(
+                select(UserBestRecord.best_time_ms, UserBestRecord.attempts).where(UserBestRecord.user_id == 1)
+            )).one()
+        assert tuple(best) == (35000, 2)
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_batch_error_reaches_every_waiter(tmp_path):
+    async def run():
+        queue, engine = await make_queue(tmp_path, max_batch=100, max_wait_ms=20)
+        queue.start()
+        # clear_time_ms is NOT NULL: the whole batch fails
+        results = await asyncio.gather(
+            queue.submit(1, 30000, PLAYED_AT), queue.submit(2, None, PLAYED_AT), return_exceptions=True
+        )
+        await queue.stop()
+
+        assert queue.batches == [2]
+        assert all(isinstance(result, Exception) for result in results)
+        async with engine.connect() as conn:
+            assert (await conn.execute(select(func.count()).select_from(GameRecord))).scalar() == 0
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_stop_flushes_the_batch_being_collected(tmp_path):
+    async def run():
+        # A deadline far beyond the test: only stop() can flush these
+        queue, engine = await make_queue(tmp_path, max_batch=100, max_wait_ms=60000)
+        queue.start()
+        pending = [asyncio.create_task(queue.submit(user_id, 30000, PLAYED_AT)) for user_id in (1, 2, 3)]
+        await asyncio.sleep(0.05)  # _run has taken the records off the queue
+
+        await asyncio.wait_for(queue.stop(), timeout=5)
+        assert all(task.done() for task in pending)
+        assert len(set(await asyncio.gather(*pending))) == 3
+        assert queue.batches == [3]
+
+        with pytest.raises(RuntimeError):
+            await queue.submit(4, 30000, PLAYED_AT)
+        await engine.dispose()
+
+    asyncio.run(run())
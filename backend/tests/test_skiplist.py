@@ -0,0 +1,47 @@
+import bisect
+import random
+
+import pytest
+
+from app.utils.skiplist import IndexableSkipList
+
+# Runs in-process (no server needed)
+
+def test_skiplist_matches_sorted_list():
+    rng = random.Random(7)
+    skiplist, expected = IndexableSkipList(seed=7), []
+
+    for step in range(5000):
+        if expected and rng.random() < 0.4:
+            key = rng.choice(expected)
+            expected.remove(key)
+            skiplist.remove(key)
+        else:
+            key = (rng.randint(0, 300), str(rng.randint(0, 30)))
+            if key in expected:
+                continue
+            bisect.insort(expected, key)
+            skiplist.insert(key)
+
+        if step % 250 == 0:
+            assert len(skiplist) == len(expected)
+            assert list(skiplist) == expected
+            for index, key in enumerate(expected):
+                assert skiplist.rank(key) == index
+                assert skiplist[index] == key
+            start = rng.randint(0, len(expected))
+            assert list(skiplist.range(start, start + 10)) == expected[start:start + 10]
+
+
+def test_skiplist_missing_and_duplicate_keys():
+    skiplist = IndexableSkipList()
+    skiplist.insert((1.0, "a"))
+
+    assert skiplist.rank((2.0, "a")) is None
+    assert list(skiplist.range(5, 10)) == []
+    with pytest.raises(KeyError):
+        skiplist.insert((1.0, "a"))
+    with pytest.raises(KeyError):
+        skiplist.remove((2.0, "a"))
+    with pytest.raises(IndexError):
+        skiplist[1]
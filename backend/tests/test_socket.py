@@ -3,6 +3,7 @@ import socketio
 import requests
 import time
 import threading
+import random
 
 # SocketIO client can be tricky in pytest if not handled carefully.
 # We will keep using the synchronous Client for simplicity as it worked in the script.
@@ -48,4 +49,131 @@ def test_socket_connection_and_event(api_url):
             sio.disconnect()
 
     assert len(events_received) > 0, "Did not receive ranking_update event"
-    assert isinstance(events_received[0], list), "Event data should be a list of rankings"
+    patch = events_received[0]
+    assert isinstance(patch, dict), "Event data should be a ranking patch"
+    assert patch["version"] > (patch["base"] or 0)
+    for key in ("moved", "inserted", "dropped"):
+        assert isinstance(patch[key], list)
+
+def test_rank_changed_pushed_to_displaced_user(api_url):
+    base_url = api_url.replace("/api/v1", "")
+    suffix = random.randint(1000, 9999)
+    score_ms = 70001 + 2 * suffix  # Odd, so no other test user ties it
+
+    def signin(name, phone):
+        token = requests.post(f"{api_url}/auth/signin", json={"name": name, "phone": phone}).json()["accessToken"]
+        return {"Authorization": f"Bearer {token}"}
+
+    victim = signin("Overtaken", f"010-4444-{suffix}")
+    rank = requests.post(f"{api_url}/games/record", json={"clearTimeMs": score_ms}, headers=victim).json()["rank"]
+
+    sio = socketio.Client()
+    received, shifts = [], []
+
+    @sio.on('rank_changed', namespace='/ranking')
+    def on_rank_changed(data):
+        received.append(data)
+
+    @sio.on('ranks_shifted', namespace='/ranking')
+    def on_ranks_shifted(data):
+        shifts.extend(data["shifts"])
+
+    sio.connect(
+        base_url, namespaces=['/ranking'], transports=['polling'],
+        auth={"token": victim["Authorization"].split()[1]}
+    )
+    try:
+        # Another player slips in just ahead
+        rival = signin("Overtaker", f"010-5555-{suffix}")
+        requests.post(f"{api_url}/games/record", json={"clearTimeMs": score_ms - 1}, headers=rival)
+        for _ in range(30):
+            if received and shifts:
+                break
+            sio.sleep(0.1)
+    finally:
+        sio.disconnect()
+
+    assert received == [{"rank": rank + 1, "previousRank": rank, "record": f"{score_ms / 1000:.2f}"}]
+    # Every socket learns that ranks from the rival's new rank on moved down
+    assert [rank, None] in shifts
+
+def test_page_subscription_receives_page_patch(api_url):
+    base_url = api_url.replace("/api/v1", "")
+    suffix = random.randint(1000, 9999)
+
+    # A record slower than everyone lands on the last page
+    total = requests.get(f"{api_url}/ranks?limit=1").json()["total"]
+    page = total // 10
+
+    sio = socketio.Client()
+    updates = []
+
+    @sio.on('ranking_update', namespace='/ranking')
+    def on_update(data):
+        updates.append(data)
+
+    sio.connect(base_url, namespaces=['/ranking'], transports=['polling'])
+    try:
+        assert sio.call('subscribe_page', {"page": -1}, namespace='/ranking')["ok"] is False
+        assert sio.call('subscribe_page', {"page": page}, namespace='/ranking') == {"ok": True, "page": page}
+
+        token = requests.post(
+            f"{api_url}/auth/signin", json={"name": "PageSub", "phone": f"010-6666-{suffix}"}
+        ).json()["accessToken"]
+        requests.post(
+            f"{api_url}/games/record", json={"clearTimeMs": 3000000 + suffix},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        for _ in range(40):
+            if updates:
+                break
+            sio.sleep(0.1)
+    finally:
+        sio.disconnect()
+
+    assert updates, "Did not receive the page's ranking_update"
+    assert {update["page"] for update in updates} == {page}
+    rows = updates[-1]["inserted"] + updates[-1]["moved"]
+    assert all(page * 10 < row["rank"] <= page * 10 + 10 for row in rows)
+    assert any(row["record"] == f"{(3000000 + suffix) / 1000:.2f}" for row in rows)
+
+def test_snapshot_on_connect_is_the_next_patch_base(api_url):
+    base_url = api_url.replace("/api/v1", "")
+    suffix = random.randint(1000, 9999)
+
+    sio = socketio.Client()
+    snapshots, updates = [], []
+
+    @sio.on('ranking_snapshot', namespace='/ranking')
+    def on_snapshot(data):
+        snapshots.append(data)
+
+    @sio.on('ranking_update', namespace='/ranking')
+    def on_update(data):
+        updates.append(data)
+
+    sio.connect(base_url, namespaces=['/ranking'], transports=['polling'])
+    try:
+        for _ in range(30):
+            if snapshots:
+                break
+            sio.sleep(0.1)
+        assert snapshots, "Did not receive ranking_snapshot on connect"
+
+        # A top-10 record: the page-0 patch must apply on the snapshot
+        token = requests.post(
+            f"{api_url}/auth/signin", json={"name": "Snapshot", "phone": f"010-8888-{suffix}"}
+        ).json()["accessToken"]
+        requests.post(f"{api_url}/games/record", json={"clearTimeMs": 2000}, headers={"Authorization": f"Bearer {token}"})
+        for _ in range(40):
+            if updates:
+                break
+            sio.sleep(0.1)
+    finally:
+        sio.disconnect()
+
+    snapshot = snapshots[0]
+    assert snapshot["page"] == 0
+    assert len(snapshot["items"]) <= 10
+    assert updates, "Did not receive the page-0 ranking_update"
+    assert updates[0]["base"] == snapshot["version"]
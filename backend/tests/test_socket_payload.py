@@ -0,0 +1,42 @@
+import pytest
+from socketio import packet
+
+from app.core.broadcaster import compact_payload, compact_row
+
+# Runs in-process: the compact schema used with SOCKETIO_SERIALIZER=msgpack
+
+def make_rows(count, skip=0):
+    return [
+        {"rank": skip + i + 1, "userId": str(1000 + i), "name": "김*수", "record": f"{45.2 + i:.2f}", "date": "2024-05-01"}
+        for i in range(count)
+    ]
+
+def test_compact_row_schema():
+    row = {"rank": 3, "userId": "42", "name": "홍*동", "record": "45.20", "date": "1970-01-11"}
+    assert compact_row(row) == [3, 42, "홍*동", 4520]
+    assert compact_row({**row, "record": "123.05"}) == [3, 42, "홍*동", 12305]
+
+def test_compact_payload_converts_every_event():
+    rows = make_rows(2)
+    patch = compact_payload({"page": 0, "version": 7, "base": 6, "moved": rows[:1], "inserted": rows[1:], "dropped": ["9"]})
+    assert patch["moved"] == [compact_row(rows[0])]
+    assert patch["inserted"] == [compact_row(rows[1])]
+    assert patch["dropped"] == [9]
+    assert (patch["page"], patch["version"], patch["base"]) == (0, 7, 6)
+
+    snapshot = compact_payload({"page": 0, "version": 7, "items": rows, "total": 2})
+    assert snapshot["items"] == [compact_row(row) for row in rows]
+
+    assert compact_payload({"rank": 4, "previousRank": 3, "record": "61.07"})["record"] == 6107
+    # The source payload is left as is (it is also the diff base)
+    assert rows[0]["record"] == "45.20"
+
+def test_msgpack_packet_is_smaller():
+    msgpack_packet = pytest.importorskip("socketio.msgpack_packet")
+    payload = {"page": 0, "version": 100, "base": 99, "moved": make_rows(10), "inserted": [], "dropped": []}
+
+    json_size = len(packet.Packet(packet.EVENT, data=['ranking_update', payload], namespace='/ranking').encode())
+    msgpack_size = len(msgpack_packet.MsgPackPacket(
+        packet.EVENT, data=['ranking_update', compact_payload(payload)], namespace='/ranking'
+    ).encode())
+    assert msgpack_size < json_size * 0.7
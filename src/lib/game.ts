@@ -46,7 +46,8 @@ export interface GameHistoryItem {
 
 export interface GameHistoryResponse {
     items: GameHistoryItem[];
-    total: number;
+    total: number | null; // null on cursor pages
+    nextCursor?: string | null;
 }
 
 export const getMyGameHistory = async (
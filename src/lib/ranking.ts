@@ -12,17 +12,152 @@ export interface MyRankResponse {
     record: string;
 }
 
+// Leaderboard window: all-time, today or this week (server local time)
+export type RankingPeriod = 'all' | 'daily' | 'weekly';
+
 export interface RankingListResponse {
     items: RankItem[];
     total: number;
+    version: number;
+}
+
+// 'ranking_update' socket event: patch of one subscribed page from leaderboard version `base` to `version`
+export interface RankingPatch {
+    page: number;
+    version: number;
+    base: number | null;
+    moved: RankItem[];
+    inserted: RankItem[];
+    dropped: string[];
+}
+
+// 'ranking_snapshot' socket event: top N as of the last page-0 broadcast (the next patch's base),
+// sent right after connecting
+export interface RankingSnapshot {
+    page: number;
+    version: number;
+    items: RankItem[];
+}
+
+// 'rank_changed' socket event: sent to a signed-in user another player just overtook
+export interface RankChanged {
+    rank: number;
+    previousRank: number;
+    record: string;
+}
+
+// 'ranks_shifted' socket event (all sockets): each [first, last] range of ranks moved down one place,
+// in submission order (last null = every rank from first on)
+export interface RanksShifted {
+    shifts: [number, number | null][];
+}
+
+// Own rank after the shifts (ranks as they were before each submission)
+export const applyRankShifts = (rank: number, shifts: RanksShifted['shifts']): number =>
+    shifts.reduce((current, [first, last]) => (
+        current >= first && (last === null || current < last) ? current + 1 : current
+    ), rank);
+
+// Compact wire schema (server SOCKETIO_SERIALIZER=msgpack): rows are
+// [rank, userId, name, record in 1/100 s],
+// userIds are numbers and 'rank_changed' records are 1/100 s
+export type CompactRankItem = [number, number, string, number];
+
+const formatCentiseconds = (centiseconds: number) =>
+    `${Math.floor(centiseconds / 100)}.${String(centiseconds % 100).padStart(2, '0')}`;
+
+const expandRow = (row: RankItem | CompactRankItem): RankItem =>
+    Array.isArray(row)
+        ? { rank: row[0], userId: String(row[1]), name: row[2], record: formatCentiseconds(row[3]) }
+        : row;
+
+type WireRow = RankItem | CompactRankItem;
+
+// Socket payloads as received, in either wire format
+export interface RankingPatchWire extends Omit<RankingPatch, 'moved' | 'inserted' | 'dropped'> {
+    moved: WireRow[];
+    inserted: WireRow[];
+    dropped: (string | number)[];
+}
+
+export interface RankingSnapshotWire extends Omit<RankingSnapshot, 'items'> {
+    items: WireRow[];
+}
+
+export interface RankChangedWire extends Omit<RankChanged, 'record'> {
+    record: string | number;
+}
+
+export const decodeRankingPatch = (data: RankingPatchWire): RankingPatch => ({
+    ...data,
+    moved: data.moved.map(expandRow),
+    inserted: data.inserted.map(expandRow),
+    dropped: data.dropped.map(String),
+});
+
+export const decodeRankingSnapshot = (data: RankingSnapshotWire): RankingSnapshot => ({
+    ...data,
+    items: data.items.map(expandRow),
+});
+
+export const decodeRankChanged = (data: RankChangedWire): RankChanged => ({
+    ...data,
+    record: typeof data.record === 'number' ? formatCentiseconds(data.record) : data.record,
+});
+
+// Apply a patch to a page of `limit` rows starting after rank `skip`.
+// Returns null if the page is not at the patch's base version.
+export const applyRankingPatch = (
+    items: RankItem[],
+    version: number,
+    patch: RankingPatch,
+    limit: number,
+    skip: number = 0
+): RankItem[] | null => {
+    if (patch.base === null || patch.base !== version) {
+        return null;
+    }
+    const dropped = new Set(patch.dropped);
+    const rows = new Map(items.filter(item => !dropped.has(item.userId)).map(item => [item.userId, item]));
+    [...patch.moved, ...patch.inserted].forEach(item => rows.set(item.userId, item));
+    return [...rows.values()]
+        .sort((a, b) => a.rank - b.rank)
+        .filter(item => item.rank > skip && item.rank <= skip + limit);
+};
+
+export const getRankings = async (
+    skip: number = 0,
+    limit: number = 10,
+    period: RankingPeriod = 'all'
+): Promise<RankingListResponse> => {
+    const response = await api.get<RankingListResponse>('/ranks', { params: { skip, limit, period } });
+    return response.data;
+};
+
+export const getMyRank = async (period: RankingPeriod = 'all'): Promise<MyRankResponse> => {
+    const response = await api.get<MyRankResponse>('/ranks/my', { params: { period } });
+    return response.data;
+};
+
+export interface RankingAroundResponse {
+    items: RankItem[];
+    rank: number; // 0 if unranked
+    total: number;
+    percentile: number; // faster than this % of players
+}
+
+export interface RankingHistogramResponse {
+    bucketMs: number;
+    total: number;
+    buckets: { fromMs: number; count: number }[];
 }
 
-export const getRankings = async (skip: number = 0, limit: number = 10): Promise<RankingListResponse> => {
-    const response = await api.get<RankingListResponse>('/ranks', { params: { skip, limit } });
+export const getRanksAroundMe = async (k: number = 5, period: RankingPeriod = 'all'): Promise<RankingAroundResponse> => {
+    const response = await api.get<RankingAroundResponse>('/ranks/around', { params: { k, period } });
     return response.data;
 };
 
-export const getMyRank = async (): Promise<MyRankResponse> => {
-    const response = await api.get<MyRankResponse>('/ranks/my');
+export const getRankingHistogram = async (period: RankingPeriod = 'all'): Promise<RankingHistogramResponse> => {
+    const response = await api.get<RankingHistogramResponse>('/ranks/histogram', { params: { period } });
     return response.data;
 };
@@ -1,9 +1,64 @@
 import { io } from 'socket.io-client';
+import * as msgpackParser from 'socket.io-msgpack-parser';
+import { decodeRankingSnapshot } from '@/lib/ranking';
+import type { RankingSnapshot, RankingSnapshotWire } from '@/lib/ranking';
 
 const URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
+// Must match the backend SOCKETIO_SERIALIZER ("default" JSON or "msgpack")
+const SERIALIZER = import.meta.env.VITE_SOCKET_SERIALIZER || 'default';
+
+// Token the current connection authenticated with (personal 'rank_changed' room)
+let connectedToken: string | null = null;
 
 export const socket = io(`${URL}/ranking`, {
     autoConnect: true,
     withCredentials: true,
-    transports: ['websocket', 'polling']
+    transports: ['websocket', 'polling'],
+    ...(SERIALIZER === 'msgpack' && { parser: msgpackParser }),
+    // Evaluated on every (re)connect
+    auth: (cb) => {
+        connectedToken = localStorage.getItem('accessToken');
+        cb({ token: connectedToken });
+    }
+});
+
+// Reconnect if the user signed in or out since the socket connected
+export const syncSocketAuth = () => {
+    if (socket.connected && localStorage.getItem('accessToken') !== connectedToken) {
+        socket.disconnect().connect();
+    }
+};
+
+// Snapshot sent on connect; dropped once a patch makes it stale
+let lastSnapshot: RankingSnapshot | null = null;
+socket.on('ranking_snapshot', (snapshot: RankingSnapshotWire) => {
+    lastSnapshot = decodeRankingSnapshot(snapshot);
 });
+socket.on('ranking_update', () => {
+    lastSnapshot = null;
+});
+socket.on('disconnect', () => {
+    lastSnapshot = null;
+});
+
+// Top-N snapshot from the socket instead of GET /ranks.
+// Resolves null if none is coming (already connected without a fresh one, or timeout).
+export const waitForRankingSnapshot = (timeoutMs: number = 2000): Promise<RankingSnapshot | null> => {
+    if (lastSnapshot) {
+        return Promise.resolve(lastSnapshot);
+    }
+    if (socket.connected) {
+        return Promise.resolve(null);
+    }
+    return new Promise(resolve => {
+        const handleSnapshot = (snapshot: RankingSnapshotWire) => {
+            clearTimeout(timer);
+            resolve(decodeRankingSnapshot(snapshot));
+        };
+        const timer = setTimeout(() => {
+            socket.off('ranking_snapshot', handleSnapshot);
+            resolve(null);
+        }, timeoutMs);
+        socket.once('ranking_snapshot', handleSnapshot);
+    });
+};
@@ -1,9 +1,11 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Crown, Medal } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { socket } from '@/lib/socket';
-import { getRankings, getMyRank } from '@/lib/ranking';
-import type { RankItem } from '@/lib/ranking';
+import { socket, syncSocketAuth, waitForRankingSnapshot } from '@/lib/socket';
+import {
+    getRankings, getMyRank, applyRankingPatch, applyRankShifts, decodeRankChanged, decodeRankingPatch, decodeRankingSnapshot
+} from '@/lib/ranking';
+import type { RankChangedWire, RankItem, RankingPatchWire, RankingSnapshotWire, RanksShifted } from '@/lib/ranking';
 import { useAuthStore } from '@/lib/store/useAuthStore';
 import {
     Table,
@@ -23,12 +25,15 @@ export const HallOfFame: React.FC = () => {
     const [myRank, setMyRank] = useState<number | null>(null);
     const user = useAuthStore(state => state.user);
     const [isInitialLoad, setIsInitialLoad] = useState(true);
+    // Leaderboard version of rankingData (ref so socket handlers see the latest value)
+    const rankingRef = useRef<{ items: RankItem[]; version: number }>({ items: [], version: -1 });
 
     const fetchRankings = async () => {
         setIsLoading(true);
         try {
             // Always fetch top 10 for Hall of Fame
             const data = await getRankings(0, 10);
+            rankingRef.current = { items: data.items, version: data.version };
             setRankingData(data.items);
         } catch (error) {
             console.error('Failed to fetch rankings:', error);
@@ -49,7 +54,15 @@ export const HallOfFame: React.FC = () => {
                     console.error("Failed to fetch my rank", e);
                 }
             }
-            await fetchRankings();
+            // The socket sends the top 10 on connect; fall back to GET /ranks
+            const snapshot = await waitForRankingSnapshot();
+            if (snapshot && snapshot.version > rankingRef.current.version) {
+                rankingRef.current = { items: snapshot.items, version: snapshot.version };
+                setRankingData(snapshot.items);
+                setIsLoading(false);
+            } else if (!snapshot) {
+                await fetchRankings();
+            }
             setIsInitialLoad(false);
         };
 
@@ -70,29 +83,78 @@ export const HallOfFame: React.FC = () => {
                 console.error('Socket connection error:', err);
             });
             socket.connect();
+        } else {
+            // Join (or leave) the personal room after signing in or out
+            syncSocketAuth();
         }
 
-        const handleRankingUpdate = async (data: any) => {
-            console.log('Ranking update received via Socket.IO:', data);
+        const handleRankingUpdate = (data: RankingPatchWire) => {
+            const patch = decodeRankingPatch(data);
+            console.log('Ranking update received via Socket.IO:', patch);
+            const { items, version } = rankingRef.current;
+            if (patch.version <= version) {
+                return; // Already applied
+            }
             showToast.success('명예의 전당이 업데이트되었습니다!');
 
-            // Re-fetch everything
-            fetchRankings();
-            if (user) {
-                try {
-                    const myRankData = await getMyRank();
-                    setMyRank(myRankData.rank);
-                } catch (e) {
-                    console.error("Failed to update my rank on socket signal", e);
-                }
+            const patched = applyRankingPatch(items, version, patch, 10);
+            if (patched) {
+                rankingRef.current = { items: patched, version: patch.version };
+                setRankingData(patched);
+            } else {
+                // Missed a version: re-fetch the full list
+                fetchRankings();
+            }
+        };
+
+        // Sent again after every reconnect: replaces the list if newer
+        const handleRankingSnapshot = (data: RankingSnapshotWire) => {
+            const snapshot = decodeRankingSnapshot(data);
+            if (snapshot.version > rankingRef.current.version) {
+                rankingRef.current = { items: snapshot.items, version: snapshot.version };
+                setRankingData(snapshot.items);
+                setIsLoading(false);
+            }
+        };
+
+        // Pushed to this user only when another player overtakes them (no polling)
+        const handleRankChanged = (data: RankChangedWire) => {
+            const change = decodeRankChanged(data);
+            setMyRank(change.rank);
+            showToast.info(`다른 참가자가 앞질렀습니다. 현재 ${change.rank}위입니다.`);
+        };
+
+        // Every player a record pushed down, beyond the personal pushes: shift our own rank locally
+        const handleRanksShifted = (data: RanksShifted) => {
+            setMyRank(rank => rank === null ? null : applyRankShifts(rank, data.shifts));
+        };
+
+        // Shifts sent while disconnected were missed: re-read our rank once
+        const handleReconnect = async () => {
+            if (!user) {
+                return;
+            }
+            try {
+                const myRankData = await getMyRank();
+                setMyRank(myRankData.rank);
+            } catch (e) {
+                console.error("Failed to refresh my rank", e);
             }
         };
 
         socket.on('ranking_update', handleRankingUpdate);
+        socket.on('rank_changed', handleRankChanged);
+        socket.on('ranking_snapshot', handleRankingSnapshot);
+        socket.on('ranks_shifted', handleRanksShifted);
+        socket.io.on('reconnect', handleReconnect);
 
         return () => {
             console.log('Cleaning up socket listeners');
             socket.off('ranking_update', handleRankingUpdate);
+            socket.off('rank_changed', handleRankChanged);
+            socket.off('ranking_snapshot', handleRankingSnapshot);
+            socket.off('ranks_shifted', handleRanksShifted);
+            socket.io.off('reconnect', handleReconnect);
         };
     }, [user]);
 
@@ -132,7 +132,7 @@ export const MyRecords: React.FC = () => {
 
             const response = await getMyGameHistory(skip, ITEMS_PER_PAGE, sortBy, order);
             setData(response.items);
-            setTotalItems(response.total);
+            setTotalItems(response.total ?? 0);
         } catch (error) {
             console.error("Failed to fetch game history:", error);
         } finally {
@@ -0,0 +1,2 @@
+// Only handed to socket.io-client's `parser` option (Encoder / Decoder); the package ships no types
+declare module 'socket.io-msgpack-parser';